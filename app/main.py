@@ -1,22 +1,105 @@
-from fastapi import FastAPI, HTTPException
+import hmac
+import json
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta, date
-import pandas as pd
 from contextlib import asynccontextmanager
 
-from src.inference import InferencePipeline
+# pandas, xgboost and the pipeline modules are imported by load_pipeline() after
+# startup, so the server answers /health before the model is ready.
+from src.limits import ConcurrencyLimiter, Overloaded
+from src.profiling import profiler
+from src.config import (
+    BATCH_MAX_DAYS, API_MAX_CONCURRENCY, API_MAX_QUEUE, API_CPU_WORKERS, API_REQUEST_TIMEOUT,
+    MODEL_WATCH_INTERVAL, ADMIN_TOKEN,
+)
+
+logger = logging.getLogger(__name__)
 
 pipeline = None
+prediction_cache = None
+async_loader = None
+cpu_pool = None
+limiter = None
+startup_task = None
+watch_task = None
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    global pipeline
+def load_pipeline():
+    """Import and build the loader, model pipeline and prediction cache (the slow part of startup)."""
+    global pipeline, prediction_cache, async_loader
+    from src.inference import InferencePipeline
+    from src.async_loader import AsyncDataLoader
+    from src.cache import PredictionCache
+
+    async_loader = AsyncDataLoader()
     try:
-        pipeline = InferencePipeline()
+        loaded = InferencePipeline()
+        prediction_cache = PredictionCache()
+        pipeline = loaded
     except Exception as e:
         print(f"Failed to initialize inference pipeline: {e}")
+
+
+async def watch_model():
+    """Check for a new or pinned model every MODEL_WATCH_INTERVAL seconds and swap it in off the request path."""
+    await startup_task
+    while pipeline is not None:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL)
+        try:
+            await asyncio.to_thread(pipeline.reload)
+        except Exception as e:
+            logger.error(f"Model reload failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global cpu_pool, limiter, startup_task, watch_task
+    cpu_pool = ThreadPoolExecutor(max_workers=API_CPU_WORKERS, thread_name_prefix="predict")
+    limiter = ConcurrencyLimiter(API_MAX_CONCURRENCY, API_MAX_QUEUE, API_REQUEST_TIMEOUT)
+    startup_task = asyncio.create_task(asyncio.to_thread(load_pipeline))
+    if MODEL_WATCH_INTERVAL > 0:
+        watch_task = asyncio.create_task(watch_model())
     yield
+    if watch_task is not None:
+        watch_task.cancel()
+    await startup_task
+    if async_loader is not None:
+        await async_loader.aclose()
+    cpu_pool.shutdown(wait=False)
+
+
+async def run_prediction(start_date, end_date, model=None):
+    """Admit the request through the limiter, then fetch asynchronously and predict on the CPU pool.
+
+    Waiting for a slot and running share one API_REQUEST_TIMEOUT deadline. A timed-out request
+    keeps its slot until its work on the CPU pool has finished, so the limiter never admits more
+    work than the pool can run.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + API_REQUEST_TIMEOUT
+    try:
+        await limiter.acquire()
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    task = asyncio.create_task(
+        pipeline.apredict_range(async_loader, start_date, end_date, executor=cpu_pool, model=model)
+    )
+    task.add_done_callback(lambda _: limiter.release())
+    try:
+        done, _ = await asyncio.wait({task}, timeout=max(deadline - loop.time(), 0))
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        raise HTTPException(status_code=504, detail="Prediction timed out.")
+    return task.result()
 
 
 app = FastAPI(title="EPIAS Energy Forecast API", lifespan=lifespan)
@@ -26,40 +109,166 @@ class PredictionRequest(BaseModel):
     date: str = Field(default=None, description="YYYY-MM-DD format", examples=["2026-02-15"])
 
 
+class BatchPredictionRequest(BaseModel):
+    start_date: str = Field(description="YYYY-MM-DD format", examples=["2026-02-01"])
+    end_date: str = Field(description="YYYY-MM-DD format, inclusive", examples=["2026-02-15"])
+
+
+class PinRequest(BaseModel):
+    version: str = Field(description="Registry version to serve", examples=["v0003"])
+
+
+def require_admin(x_admin_token: str = Header(default=None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "model_loaded": pipeline.model is not None if pipeline else False}
+    return {
+        "status": "ok",
+        "loading": startup_task is not None and not startup_task.done(),
+        "model_loaded": pipeline.model is not None if pipeline else False,
+        "model_version": pipeline.model_version if pipeline else None,
+        "model_fingerprint": pipeline.model_fingerprint if pipeline else None,
+        "cache": prediction_cache.info() if prediction_cache else None,
+        "limiter": limiter.info() if limiter else None,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Stage timings, fetch counters and cache/limiter state in Prometheus text format."""
+    gauges = {}
+    if prediction_cache:
+        gauges.update({f"cache_{k}": v for k, v in prediction_cache.info().items()})
+    if limiter:
+        gauges.update({f"limiter_{k}": v for k, v in limiter.info().items()})
+    return profiler.prometheus(gauges)
 
 
 @app.post("/predict")
-def predict(request: PredictionRequest):
+async def predict(request: PredictionRequest):
     if pipeline is None or pipeline.model is None:
         raise HTTPException(status_code=503, detail="Model not initialized.")
-    
+    import pandas as pd
+
     try:
-        if request.date:
-            target_date = pd.to_datetime(request.date)
-        else:
-            target_date = datetime.now() + timedelta(days=-1)
-
-        limit_date = date.today() + timedelta(days=-1)
-        if target_date.date() > limit_date:
-            raise HTTPException(
-                status_code=422,
-                detail=(f"Cannot predict beyond {limit_date}.")
-            )
-
-        results = pipeline.predict(target_date)
+        target_date = pd.to_datetime(request.date) if request.date else datetime.now() + timedelta(days=-1)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Invalid date: {e}")
+
+    limit_date = date.today() + timedelta(days=-1)
+    if target_date.date() > limit_date:
+        raise HTTPException(status_code=422, detail=f"Cannot predict beyond {limit_date}.")
+
+    try:
+        # Keep this request on the model that is current now, even if a new one is swapped in meanwhile
+        model = pipeline.loaded
+        results = await prediction_cache.aget_or_compute(
+            target_date, model.fingerprint, lambda: run_prediction(target_date, target_date, model)
+        )
         
         return {
             "target_date": str(target_date.date()),
             "predictions": results.to_dict(orient="records")
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/predict/batch")
+async def predict_batch(request: BatchPredictionRequest):
+    """Predict a range of days in one pass and stream the hourly rows back as NDJSON."""
+    if pipeline is None or pipeline.model is None:
+        raise HTTPException(status_code=503, detail="Model not initialized.")
+    import pandas as pd
+
+    try:
+        start_date = pd.to_datetime(request.start_date)
+        end_date = pd.to_datetime(request.end_date)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Invalid date: {e}")
+
+    limit_date = date.today() + timedelta(days=-1)
+    if end_date.date() > limit_date:
+        raise HTTPException(status_code=422, detail=f"Cannot predict beyond {limit_date}.")
+    if start_date > end_date:
+        raise HTTPException(status_code=422, detail="start_date must not be after end_date.")
+    if (end_date - start_date).days + 1 > BATCH_MAX_DAYS:
+        raise HTTPException(status_code=422, detail=f"Range exceeds {BATCH_MAX_DAYS} days.")
+
+    try:
+        results = await run_prediction(start_date, end_date)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def rows():
+        for ts, value in zip(results['date'], results['prediction']):
+            yield json.dumps({"date": ts.isoformat(), "prediction": float(value)}) + "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+def model_state() -> dict:
+    registry = pipeline.registry
+    return {
+        "active": pipeline.model_version,
+        "fingerprint": pipeline.model_fingerprint,
+        "path": pipeline.loaded.path if pipeline.loaded else None,
+        "pinned": registry.pinned() if registry else None,
+        "versions": registry.entries() if registry else [],
+    }
+
+
+async def change_model(action: str, *args) -> dict:
+    """Run a pipeline pin/rollback/unpin off the event loop and map its errors to HTTP codes."""
+    from src.registry import ModelValidationError
+
+    if pipeline is None:
+        raise HTTPException(status_code=503, detail="Model not initialized.")
+    try:
+        await asyncio.to_thread(getattr(pipeline, action), *args)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ModelValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return model_state()
+
+
+@app.get("/admin/models", dependencies=[Depends(require_admin)])
+def list_models():
+    """Registry versions, the pinned one and the one being served."""
+    if pipeline is None:
+        raise HTTPException(status_code=503, detail="Model not initialized.")
+    return model_state()
+
+
+@app.post("/admin/models/pin", dependencies=[Depends(require_admin)])
+async def pin_model(request: PinRequest):
+    """Validate a version and serve it until unpinned."""
+    return await change_model("pin", request.version)
+
+
+@app.post("/admin/models/rollback", dependencies=[Depends(require_admin)])
+async def rollback_model():
+    """Pin the version published before the one being served."""
+    return await change_model("rollback")
+
+
+@app.delete("/admin/models/pin", dependencies=[Depends(require_admin)])
+async def unpin_model():
+    """Drop the pin and serve the newest valid version."""
+    return await change_model("unpin")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,83 @@
+"""Benchmark Database.bulk_upsert_monitoring against the row-wise upsert path.
+
+Runs against a throwaway SQLite file by default; pass --db-url to point it
+at a PostgreSQL instance instead (the table is written to, so use a scratch
+database).
+
+    python benchmarks/bench_database.py [--days 30] [--db-url URL]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database import Database
+
+
+def make_frame(days: int, start: str = "2020-01-01") -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(start, periods=days * 24, freq='h')
+    base = 32000 + 4000 * np.sin(2 * np.pi * np.arange(len(dates)) / 24)
+    df = pd.DataFrame({
+        'date': dates,
+        'actual_consumption': base + rng.normal(0, 500, len(dates)),
+        'epias_forecast': base + rng.normal(0, 800, len(dates)),
+        'model_prediction': base + rng.normal(0, 700, len(dates)),
+    })
+    # Mimic partially available days: some hours have no actuals yet.
+    df.loc[df.sample(frac=0.05, random_state=0).index, 'actual_consumption'] = np.nan
+    return df
+
+
+def rowwise_upsert(db: Database, df: pd.DataFrame):
+    for _, row in df.iterrows():
+        db.upsert_monitoring_data(
+            row['date'].to_pydatetime(),
+            row['actual_consumption'] if pd.notnull(row['actual_consumption']) else None,
+            row['epias_forecast'] if pd.notnull(row['epias_forecast']) else None,
+            row['model_prediction'] if pd.notnull(row['model_prediction']) else None,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--db-url', default=None)
+    args = parser.parse_args()
+
+    df = make_frame(args.days)
+    with tempfile.TemporaryDirectory() as tmp:
+        rowwise_db = Database(args.db_url or f"sqlite:///{os.path.join(tmp, 'rowwise.db')}")
+        bulk_db = Database(args.db_url or f"sqlite:///{os.path.join(tmp, 'bulk.db')}")
+
+        start = time.perf_counter()
+        rowwise_upsert(rowwise_db, df)
+        t_rowwise = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bulk_db.bulk_upsert_monitoring(df)
+        t_bulk = time.perf_counter() - start
+
+        # Second pass with NULL forecasts checks that existing values are preserved.
+        bulk_db.bulk_upsert_monitoring(df.assign(epias_forecast=np.nan))
+        stored = {r.date: r.epias_forecast for r in bulk_db.get_monitoring_data()}
+        if any(v is None for v in stored.values()):
+            raise AssertionError("bulk upsert overwrote stored values with NULL")
+
+        rowwise_db.engine.dispose()
+        bulk_db.engine.dispose()
+
+    print(f"rows: {len(df)}")
+    print(f"row-wise upsert: {t_rowwise * 1000:9.1f} ms")
+    print(f"bulk upsert:     {t_bulk * 1000:9.1f} ms")
+    print(f"speedup:         {t_rowwise / t_bulk:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
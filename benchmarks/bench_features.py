@@ -0,0 +1,115 @@
+"""Benchmark FeatureEngineer.process_data on the 2022-2025 training frame.
+
+Compares the single-pass engine against the previous step-by-step
+implementation (reproduced below) and checks that both produce the same
+feature values.
+
+    python benchmarks/bench_features.py [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import holidays
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import FEATURE_COLUMNS
+from src.calendar_features import expand_ranges, RAMADAN_DATES, KURBAN_DATES
+from src.features import FeatureEngineer
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'notebook', 'epias_data_2022-2025.csv')
+
+
+def legacy_process_data(df: pd.DataFrame, forecast_df: pd.DataFrame) -> pd.DataFrame:
+    """The original copy-per-step pipeline, kept here as the baseline."""
+    ramadan_set, kurban_set = set(expand_ranges(RAMADAN_DATES).date), set(expand_ranges(KURBAN_DATES).date)
+
+    df = df.copy().set_index('date')
+    df = df.copy()
+    df['hour'] = df.index.hour
+    df['dayofyear'] = df.index.dayofyear
+    df['dayofweek'] = df.index.dayofweek
+    df['month'] = df.index.month
+    df['quarter'] = df.index.quarter
+    df['year'] = df.index.year
+
+    df = df.copy()
+    holiday_dates = set(holidays.Turkey(years=df.index.year.unique()).keys())
+    df['is_holiday'] = df.index.map(lambda x: x.date() in holiday_dates).astype(int)
+
+    df = df.copy()
+    dates = df.index.date
+    df['is_ramadan'] = [1 if d in ramadan_set else 0 for d in dates]
+    df['is_kurban'] = [1 if d in kurban_set else 0 for d in dates]
+
+    df = df.copy()
+    for lag in (48, 72, 168):
+        df[f'lag_{lag}'] = df['consumption'].shift(lag)
+
+    df = df.copy()
+    df['roll_mean_1d'] = df['lag_48'].rolling(window=24).mean()
+    df['roll_std_1d'] = df['lag_48'].rolling(window=24).std()
+    df['roll_mean_1w'] = df['lag_48'].rolling(window=168).mean()
+    df['roll_std_1w'] = df['lag_48'].rolling(window=168).std()
+
+    df = df.copy().reset_index()
+    df['date'] = pd.to_datetime(df['date'].astype(str).str[:19])
+    forecast_df = forecast_df.copy()
+    forecast_df['date'] = pd.to_datetime(forecast_df['date'].astype(str).str[:19])
+    df = pd.merge(df, forecast_df, on='date', how='left').set_index('date')
+
+    df = df.copy()
+    df['temp_squared'] = df['forecast_temp'] ** 2
+    return df
+
+
+def load_frames():
+    df = pd.read_csv(DATA_PATH)
+    df['date'] = pd.to_datetime(df['date'], utc=True).dt.tz_convert("Europe/Istanbul")
+
+    # Synthetic seasonal temperature; only the shape of the frame matters here.
+    rng = np.random.default_rng(0)
+    doy = df['date'].dt.dayofyear.to_numpy()
+    temp = 12 - 12 * np.cos(2 * np.pi * doy / 365.25) + rng.normal(0, 2, len(df))
+    forecast_df = pd.DataFrame({'date': df['date'], 'forecast_temp': temp})
+    return df, forecast_df
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df, forecast_df = load_frames()
+    engineer = FeatureEngineer()
+
+    legacy = legacy_process_data(df, forecast_df)
+    current = engineer.process_data(df, forecast_df)
+    for col in FEATURE_COLUMNS:
+        if not np.allclose(legacy[col].to_numpy(float), current[col].to_numpy(float), equal_nan=True):
+            raise AssertionError(f"Feature mismatch in column {col}")
+
+    t_legacy = timeit(lambda: legacy_process_data(df, forecast_df), args.repeat)
+    t_current = timeit(lambda: engineer.process_data(df, forecast_df), args.repeat)
+
+    print(f"rows: {len(df)}")
+    print(f"legacy process_data:  {t_legacy * 1000:8.1f} ms")
+    print(f"current process_data: {t_current * 1000:8.1f} ms")
+    print(f"speedup:              {t_legacy / t_current:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark model startup and per-call latency for each inference backend.
+
+Startup compares loading the JSON model with the UBJSON export (written
+to a temporary directory). Per-call latency is measured on a 24-row
+day-ahead batch and on a year of hourly rows.
+
+    python benchmarks/bench_model.py [--model model.json] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import FEATURE_COLUMNS, MODEL_PATH
+from src.model_backend import BACKENDS, export_binary
+
+
+def timeit(fn, repeat: int) -> np.ndarray:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return np.array(samples)
+
+
+def load(path: str) -> xgb.XGBRegressor:
+    model = xgb.XGBRegressor()
+    model.load_model(path)
+    return model
+
+
+def make_features(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2025-01-01", periods=rows, freq='h', tz="Europe/Istanbul")
+    base = 33000 + 5000 * np.sin(2 * np.pi * np.arange(rows) / 24)
+    temp = rng.normal(15, 8, rows)
+    return pd.DataFrame({
+        'hour': index.hour, 'dayofweek': index.dayofweek, 'dayofyear': index.dayofyear,
+        'month': index.month, 'quarter': index.quarter, 'year': index.year,
+        'is_holiday': 0, 'is_ramadan': 0, 'is_kurban': 0,
+        'forecast_temp': temp, 'temp_squared': temp ** 2,
+        'lag_48': base, 'lag_72': base, 'lag_168': base,
+        'roll_mean_1d': base, 'roll_std_1d': 3000.0, 'roll_mean_1w': base, 'roll_std_1w': 3500.0,
+    }, index=index)[FEATURE_COLUMNS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ubj_path = export_binary(load(args.model), os.path.join(tmp, 'model.json'))
+        t_json = timeit(lambda: load(args.model), 5)
+        t_ubj = timeit(lambda: load(ubj_path), 5)
+
+    print("startup (median of 5)")
+    print(f"  load JSON:    {np.median(t_json) * 1000:8.1f} ms")
+    print(f"  load UBJSON:  {np.median(t_ubj) * 1000:8.1f} ms")
+
+    model = load(args.model)
+    for rows in (24, 24 * 365):
+        X = make_features(rows)
+        reference = BACKENDS['sklearn'](model).predict(X)
+        print(f"predict, {rows} rows (p50 / p95)")
+        for name, backend_cls in BACKENDS.items():
+            start = time.perf_counter()
+            backend = backend_cls(model)
+            t_init = time.perf_counter() - start
+
+            preds = backend.predict(X)
+            max_diff = float(np.max(np.abs(preds - reference)))
+            samples = timeit(lambda: backend.predict(X), args.repeat)
+            print(f"  {name:8s} {np.percentile(samples, 50) * 1000:8.2f} / {np.percentile(samples, 95) * 1000:8.2f} ms"
+                  f"  (init {t_init * 1000:.0f} ms, max |diff| {max_diff:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Cold-start time per entry point, measured in fresh interpreters with ``-X importtime``.
+
+Each case runs in a new ``python`` process ``--repeat`` times. It records the
+median cumulative import time of the entry module, the wall time of the
+process and which heavy libraries were loaded. ``api.health`` times the API
+from import until the first ``/health`` answer. The model, pandas and xgboost
+load in the background after that, so none of them should be listed there.
+Cases over their budget are flagged.
+
+    python benchmarks/bench_startup.py [--repeat 5] [--baseline benchmarks/results/startup_baseline.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+
+HEAVY_MODULES = ["pandas", "xgboost", "sklearn", "scipy", "holidays", "sqlalchemy", "httpx", "pyarrow"]
+
+_REPORT = f"import sys, json; print('LOADED=' + json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+
+_HEALTH = """
+import asyncio, time
+start = time.perf_counter()
+import app.main as m
+
+async def first_health():
+    async with m.lifespan(m.app):
+        m.health_check()
+        print(f"HEALTH_MS={(time.perf_counter() - start) * 1000:.3f}")
+        {report}
+        import os; os._exit(0)
+
+asyncio.run(first_health())
+"""
+
+CASES = {
+    "api.import": ("import app.main", 800),
+    "api.health": (_HEALTH, 1000),
+    "daily_run.import": ("import scripts.daily_run", 3000),
+    "dashboard.data_layer": ("import src.dashboard_data", 1500),
+    "features.import": ("import src.features", 800),
+    "features.first_calendar": (
+        "import time; import src.features; from src.calendar_features import calendar_table; "
+        "t = time.perf_counter(); calendar_table(); print(f'STEP_MS={(time.perf_counter() - t) * 1000:.3f}')", 1500),
+}
+
+
+def top_level_import_ms(stderr: str) -> float:
+    """Sum of the cumulative times of top-level imports in ``-X importtime`` output."""
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  ") and cumulative.strip().isdigit():
+            total += int(cumulative)
+    return total / 1000
+
+
+def run_case(code: str, repeat: int) -> dict:
+    code = code.replace("{report}", _REPORT)
+    if "LOADED=" not in code:
+        code = f"{code}\n{_REPORT}"
+
+    imports, walls, steps, loaded = [], [], [], []
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "0", "PROFILING_ENABLED": "0"}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_DIR, env=env,
+                              capture_output=True, text=True, timeout=300)
+        walls.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr[-2000:])
+
+        imports.append(top_level_import_ms(proc.stderr))
+        for line in proc.stdout.splitlines():
+            if line.startswith(("HEALTH_MS=", "STEP_MS=")):
+                steps.append(float(line.split("=", 1)[1]))
+            elif line.startswith("LOADED="):
+                loaded = json.loads(line.split("=", 1)[1])
+
+    timed = np.array(steps) if steps else np.array(imports)
+    return {
+        "repeat": repeat,
+        "p50_ms": round(float(np.percentile(timed, 50)), 3),
+        "p95_ms": round(float(np.percentile(timed, 95)), 3),
+        "import_ms": round(float(np.median(imports)), 3),
+        "process_wall_ms": round(float(np.median(walls)) * 1000, 3),
+        "heavy_modules": loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cases', default=",".join(CASES), help="Comma-separated subset of cases")
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results', 'startup_latest.json'))
+    parser.add_argument('--baseline', default=None)
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--fail-on-regression', action='store_true', help="Also fail when a case exceeds its budget")
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so every case measures imports, not compilation
+    subprocess.run([sys.executable, "-m", "compileall", "-q", "src", "app", "scripts"], cwd=REPO_DIR)
+
+    results, over_budget = {}, []
+    for name in [c.strip() for c in args.cases.split(",") if c.strip()]:
+        code, budget_ms = CASES[name]
+        result = run_case(code, args.repeat)
+        result["budget_ms"] = budget_ms
+        results[name] = result
+        flag = "  OVER BUDGET" if result["p50_ms"] > budget_ms else ""
+        if flag:
+            over_budget.append(name)
+        print(f"{name:26s} p50 {result['p50_ms']:8.1f} ms (budget {budget_ms:5d})  process {result['process_wall_ms']:8.1f} ms  "
+              f"heavy: {', '.join(result['heavy_modules']) or '-'}{flag}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"meta": {"python": sys.version.split()[0], "repeat": args.repeat}, "results": results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    regressions = []
+    if args.baseline:
+        sys.path.append(BENCH_DIR)
+        from run_suite import compare
+
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    if args.fail_on_regression and (regressions or over_budget):
+        sys.exit(f"{len(regressions)} regression(s), {len(over_budget)} case(s) over budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Local stand-in for the EPIAS and Open-Meteo HTTP APIs.
+
+Serves the TGT ticket endpoint, realtime consumption, the load estimation
+plan and the Open-Meteo historical forecast from ``synthetic``, with an
+optional per-request latency. Point the loaders at it through the URL
+settings before ``src`` is imported:
+
+    with FakeServices(latency=0.02) as services:
+        os.environ.update(services.env())
+        from src.data_loader import DataLoader
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+import synthetic
+
+CONSUMPTION_PATH = "/electricity-service/v1/consumption/data/realtime-consumption"
+LOAD_PLAN_PATH = "/electricity-service/v1/consumption/data/load-estimation-plan"
+
+
+def _epias_items(body: dict, values, column: str) -> list:
+    start = pd.Timestamp(body["startDate"]).tz_convert(synthetic.TIMEZONE)
+    end = pd.Timestamp(body["endDate"]).tz_convert(synthetic.TIMEZONE)
+    index = synthetic.hourly_index(start.tz_localize(None), end.tz_localize(None))
+    index = index[(index >= start) & (index <= end)]
+    dates = index.strftime("%Y-%m-%dT%H:%M:%S%z")
+    dates = [f"{d[:-2]}:{d[-2:]}" for d in dates]
+    return [{"date": d, "time": d[11:16], column: float(v)} for d, v in zip(dates, values(index))]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, payload=None, headers: dict = None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_POST(self):
+        self.server.services.requests += 1
+        time.sleep(self.server.services.latency)
+        path = urlparse(self.path).path
+        raw = self._read_body()
+
+        if path == "/cas/v1/tickets":
+            return self._send(201, headers={"Location": f"http://{self.headers['Host']}/cas/v1/tickets/TGT-fake"})
+        if path == CONSUMPTION_PATH:
+            return self._send(200, {"items": _epias_items(json.loads(raw), synthetic.consumption, "consumption")})
+        if path == LOAD_PLAN_PATH:
+            return self._send(200, {"items": _epias_items(json.loads(raw), synthetic.load_plan, "lep")})
+        self._send(404, {"error": path})
+
+    def do_GET(self):
+        self.server.services.requests += 1
+        time.sleep(self.server.services.latency)
+        url = urlparse(self.path)
+        if url.path != "/v1/forecast":
+            return self._send(404, {"error": url.path})
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        index = synthetic.hourly_index(params["start_date"], params["end_date"])
+        self._send(200, {
+            "latitude": float(params["latitude"]),
+            "longitude": float(params["longitude"]),
+            "hourly": {
+                "time": list(index.strftime("%Y-%m-%dT%H:%M")),
+                "temperature_2m": synthetic.temperature(index, float(params["latitude"])).tolist(),
+            },
+        })
+
+
+class FakeServices:
+    """Threaded local HTTP server for the duration of a ``with`` block."""
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1"):
+        self.latency = latency
+        self.requests = 0
+        self.server = ThreadingHTTPServer((host, 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.services = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict:
+        """Settings that point DataLoader/AsyncDataLoader at this server."""
+        return {
+            "EPIAS_AUTH_URL": f"{self.url}/cas/v1/tickets",
+            "EPIAS_API_URL": f"{self.url}/electricity-service/v1",
+            "WEATHER_API_URL": f"{self.url}/v1/forecast",
+            "EPIAS_USERNAME": "bench",
+            "EPIAS_PASSWORD": "bench",
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
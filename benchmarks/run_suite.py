@@ -0,0 +1,248 @@
+"""Repeatable micro and macro benchmarks on synthetic data, recorded as a JSON baseline.
+
+Micro benchmarks time single hot paths (feature engineering, the model call,
+database writes, the dashboard's data load) over synthetic series from one
+month to twenty years. Macro benchmarks run the fetch and inference paths end
+to end against a local fake EPIAS/Open-Meteo server, so no credentials or
+network are needed.
+
+Each case records latency percentiles, throughput and the peak Python heap
+(tracemalloc, measured in a separate untimed run). Comparing against a saved
+baseline flags cases whose median got slower than ``--threshold``.
+
+    python benchmarks/run_suite.py --output benchmarks/results/baseline.json
+    python benchmarks/run_suite.py --baseline benchmarks/results/baseline.json --fail-on-regression
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+sys.path.append(REPO_DIR)
+
+import synthetic
+from fake_services import FakeServices
+
+ANCHOR_END = pd.Timestamp("2025-12-31")
+TARGET_DAY = pd.Timestamp("2025-06-15")
+
+
+def span_start(span: str) -> pd.Timestamp:
+    return ANCHOR_END + pd.Timedelta(days=1) - synthetic.parse_span(span)
+
+
+def measure(fn, repeat: int, items: int = None, unit: str = "rows", setup=None, warmup: int = 1) -> dict:
+    """Time ``fn`` ``repeat`` times (after ``warmup`` runs), then once more under tracemalloc."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = np.array(samples)
+    result = {
+        "repeat": repeat,
+        "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(samples, 95)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(samples, 99)) * 1000, 3),
+        "mean_ms": round(float(samples.mean()) * 1000, 3),
+        "min_ms": round(float(samples.min()) * 1000, 3),
+        "peak_mem_mb": round(peak / 2**20, 2),
+    }
+    if items:
+        result["throughput"] = round(items / float(np.percentile(samples, 50)), 1)
+        result["unit"] = f"{unit}/s"
+    return result
+
+
+def micro_benchmarks(sizes: list, repeat: int, tmp: str) -> dict:
+    from src.database import Database
+    from src.features import FeatureEngineer
+    from src.inference import InferencePipeline
+
+    results = {}
+    engineer = FeatureEngineer()
+    for span in sizes:
+        consumption = synthetic.consumption_frame(span_start(span), ANCHOR_END)
+        weather = synthetic.weather_frame(span_start(span), ANCHOR_END)
+        results[f"features.process_data[{span}]"] = measure(
+            lambda: engineer.process_data(consumption, weather), repeat, items=len(consumption))
+
+    pipeline = InferencePipeline()
+    history = synthetic.consumption_frame(span_start("1y"), ANCHOR_END)
+    features = engineer.process_data(history, synthetic.weather_frame(span_start("1y"), ANCHOR_END))
+    for rows in (24, len(features)):
+        X = features.iloc[-rows:]
+        results[f"model.predict[{rows}]"] = measure(lambda: pipeline.backend.predict(X), repeat * 4, items=rows)
+
+    db = Database(f"sqlite:///{os.path.join(tmp, 'micro.db')}")
+    day = synthetic.monitoring_frame(TARGET_DAY, TARGET_DAY)
+
+    def rowwise():
+        for row in day.itertuples(index=False):
+            db.upsert_monitoring_data(row.date.to_pydatetime(), row.actual_consumption, row.epias_forecast, row.model_prediction)
+
+    results["db.upsert_monitoring_data[24]"] = measure(rowwise, repeat, items=len(day))
+    results["db.bulk_upsert[24]"] = measure(lambda: db.bulk_upsert_monitoring(day), repeat * 4, items=len(day))
+
+    for span in sizes:
+        frame = synthetic.monitoring_frame(span_start(span), ANCHOR_END)
+        span_db = Database(f"sqlite:///{os.path.join(tmp, f'dashboard_{span}.db')}")
+        results[f"db.bulk_upsert[{span}]"] = measure(
+            lambda: span_db.bulk_upsert_monitoring(frame), max(1, repeat // 2), items=len(frame), warmup=0)
+
+        def dashboard_load():
+            first, last = span_db.get_monitoring_date_bounds()
+            span_db.get_monitoring_frame(first, last)
+            span_db.get_error_metrics(first, last, by_day=True)
+
+        results[f"dashboard.load[{span}]"] = measure(dashboard_load, repeat, items=len(frame))
+        span_db.engine.dispose()
+
+    db.engine.dispose()
+    return results
+
+
+def macro_benchmarks(repeat: int, tmp: str) -> dict:
+    from src.data_loader import DataLoader
+    from src.inference import InferencePipeline
+    from src.store import HistoryStore
+
+    results = {}
+    state = {}
+
+    def fresh_store():
+        state['loader'] = DataLoader(store=HistoryStore(tempfile.mkdtemp(dir=tmp)))
+
+    results["fetch.consumption_cold[1y]"] = measure(
+        lambda: state['loader'].get_realtime_consumption(span_start("1y"), ANCHOR_END),
+        max(1, repeat // 2), items=len(synthetic.hourly_index(span_start("1y"), ANCHOR_END)), setup=fresh_store)
+
+    pipeline = InferencePipeline()
+
+    def cold_pipeline():
+        pipeline.data_loader = DataLoader(store=HistoryStore(tempfile.mkdtemp(dir=tmp)))
+
+    results["pipeline.predict_cold[1d]"] = measure(lambda: pipeline.predict(TARGET_DAY), repeat, items=24, setup=cold_pipeline)
+
+    pipeline.data_loader = DataLoader(store=HistoryStore(os.path.join(tmp, 'warm')))
+    results["pipeline.predict_warm[1d]"] = measure(lambda: pipeline.predict(TARGET_DAY), repeat, items=24)
+    results["pipeline.predict_range_warm[30d]"] = measure(
+        lambda: pipeline.predict_range(TARGET_DAY - pd.Timedelta(days=29), TARGET_DAY), repeat, items=24 * 30)
+    return results
+
+
+def metadata(args) -> dict:
+    import xgboost
+
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                  capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        revision = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "xgboost": xgboost.__version__,
+        "sizes": args.sizes,
+        "repeat": args.repeat,
+        "latency_ms": args.latency * 1000,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print median changes against ``baseline`` and return the cases slower than ``threshold``."""
+    regressions = []
+    print(f"\n{'case':40s} {'base p50':>10s} {'new p50':>10s} {'change':>8s}")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        change = result["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:40s} {base['p50_ms']:10.2f} {result['p50_ms']:10.2f} {change:+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default="1m,1y,5y,20y", help="Comma-separated spans for the scaling cases")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.01, help="Seconds of fake upstream latency per request")
+    parser.add_argument('--skip-macro', action='store_true', help="Only run the in-process micro benchmarks")
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results', 'latest.json'))
+    parser.add_argument('--baseline', default=None, help="Earlier output to compare medians against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Relative p50 slowdown that counts as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp, FakeServices(latency=args.latency) as services:
+        # Settings are read at import time, so point src at the fake server and scratch dirs first
+        os.environ.update(services.env())
+        os.environ.update({
+            "HISTORY_STORE_DIR": os.path.join(tmp, 'history'),
+            "FEATURE_CACHE_DIR": os.path.join(tmp, 'features'),
+            "PREDICTION_CACHE_DB": "",
+            "MODEL_REGISTRY_DIR": "",
+            "PROFILING_ENABLED": "0",
+            "MODEL_PATH": os.environ.get("MODEL_PATH", os.path.join(REPO_DIR, 'model.json')),
+        })
+
+        results = micro_benchmarks(sizes, args.repeat, tmp)
+        if not args.skip_macro:
+            results.update(macro_benchmarks(args.repeat, tmp))
+        meta = metadata(args)
+        meta["fake_requests"] = services.requests
+
+    for name, result in results.items():
+        rate = f"{result['throughput']:>12,.0f} {result['unit']}" if "throughput" in result else ""
+        print(f"{name:40s} p50 {result['p50_ms']:10.2f} ms  p95 {result['p95_ms']:10.2f} ms  "
+              f"peak {result['peak_mem_mb']:8.1f} MiB  {rate}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
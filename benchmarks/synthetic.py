@@ -0,0 +1,81 @@
+"""Deterministic synthetic hourly series standing in for EPIAS and Open-Meteo data.
+
+Values are pure functions of the timestamp, so any sub-range returns the same
+numbers no matter how a request is chunked. Spans are written like ``1m``,
+``1y`` or ``20y``.
+"""
+import numpy as np
+import pandas as pd
+
+TIMEZONE = "Europe/Istanbul"
+SPAN_UNITS = {"d": "days", "w": "weeks", "m": "months", "y": "years"}
+
+
+def parse_span(span: str) -> pd.DateOffset:
+    count, unit = int(span[:-1]), span[-1]
+    if unit not in SPAN_UNITS:
+        raise ValueError(f"Unknown span unit in {span!r}; use one of {''.join(SPAN_UNITS)}")
+    return pd.DateOffset(**{SPAN_UNITS[unit]: count})
+
+
+def hourly_index(start, end=None, span: str = None) -> pd.DatetimeIndex:
+    """Istanbul-time hourly index from ``start`` to ``end`` (inclusive day) or over ``span``."""
+    start = pd.Timestamp(start).normalize()
+    if end is None:
+        end = start + parse_span(span) - pd.Timedelta(days=1)
+    end = pd.Timestamp(end).normalize() + pd.Timedelta(hours=23)
+    return pd.date_range(start, end, freq='h', tz=TIMEZONE)
+
+
+def _hours(index: pd.DatetimeIndex) -> np.ndarray:
+    return index.tz_convert("UTC").tz_localize(None).to_numpy().astype('datetime64[h]').astype(np.int64).astype(np.float64)
+
+
+def _noise(t: np.ndarray, seed: int) -> np.ndarray:
+    # Hash-like pseudo-noise in [-1, 1] that depends only on the hour, not on the request window
+    return np.sin(t * 12.9898 + seed * 78.233) * 43758.5453 % 1.0 * 2 - 1
+
+
+def temperature(index: pd.DatetimeIndex, latitude: float = 39.0) -> np.ndarray:
+    t = _hours(index)
+    seasonal = -11 * np.cos(2 * np.pi * (t - 24 * 20) / 8766)
+    daily = -5 * np.cos(2 * np.pi * (t + 3 - 6) / 24)
+    return np.round(12 + (39.0 - latitude) + seasonal + daily + 1.5 * _noise(t, 1), 1)
+
+
+def consumption(index: pd.DatetimeIndex) -> np.ndarray:
+    t = _hours(index)
+    local_hour = index.hour.to_numpy()
+    weekend = index.dayofweek.to_numpy() >= 5
+    temp = temperature(index)
+    daily = 4000 * np.sin(2 * np.pi * (local_hour - 8) / 24)
+    trend = 30000 + 800 * (t / 8766 - 50)  # ~800 MWh/year growth from 2020
+    return np.round(trend + daily - 3500 * weekend + 40 * (temp - 18) ** 2 + 600 * _noise(t, 2), 2)
+
+
+def load_plan(index: pd.DatetimeIndex) -> np.ndarray:
+    t = _hours(index)
+    return np.round(consumption(index) + 900 * _noise(t, 3), 2)
+
+
+def consumption_frame(start, end=None, span: str = None) -> pd.DataFrame:
+    index = hourly_index(start, end, span)
+    return pd.DataFrame({'date': index, 'consumption': consumption(index)})
+
+
+def weather_frame(start, end=None, span: str = None, latitude: float = 39.0) -> pd.DataFrame:
+    index = hourly_index(start, end, span)
+    return pd.DataFrame({'date': index, 'forecast_temp': temperature(index, latitude)})
+
+
+def monitoring_frame(start, end=None, span: str = None) -> pd.DataFrame:
+    """Rows shaped like the daily_monitoring table (naive local timestamps)."""
+    index = hourly_index(start, end, span)
+    actual = consumption(index)
+    t = _hours(index)
+    return pd.DataFrame({
+        'date': index.tz_localize(None),
+        'actual_consumption': actual,
+        'epias_forecast': load_plan(index),
+        'model_prediction': np.round(actual + 700 * _noise(t, 4), 2),
+    })
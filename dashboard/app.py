@@ -1,13 +1,15 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import sys, os
 
 # project root to path so Streamlit can find the src package
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.database import Database
+from src.dashboard_data import MonitoringFrameCache, select_range, lttb_trace, daily_mean
+from src.config import DASHBOARD_CACHE_TTL, DASHBOARD_MAX_POINTS
 
 st.set_page_config(page_title="Türkiye's Electricity Consumption Prediction", layout="wide")
 
@@ -21,64 +23,63 @@ def get_db():
     return Database()
 
 
-db = get_db()
-data = db.get_monitoring_data()
+@st.cache_resource
+def get_monitoring_cache():
+    return MonitoringFrameCache(get_db())
+
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL)
+def load_monitoring() -> pd.DataFrame:
+    """All hourly rows; after the TTL only rows newer than the cached ones are read."""
+    return get_monitoring_cache().refresh()
+
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL)
+def load_error_metrics(start, end) -> pd.Series:
+    return get_db().get_error_metrics(start, end).iloc[0]
+
+
+DISPLAY_NAMES = {
+    'actual_consumption': 'Actual',
+    'epias_forecast': 'EPIAS Forecast',
+    'model_prediction': 'Model Prediction',
+}
+
+
+def show_metrics(metrics: pd.Series):
+    col1, col2, col3 = st.columns(3)
+
+    col1.metric("XGBoost MAE", f"{metrics['mae_model']:.2f}", delta=f"{(metrics['mae_model']-metrics['mae_epias']):.2f} vs EPIAS Forecast", delta_color="inverse")
+    col2.metric("XGBoost MAPE", f"{metrics['mape_model']:.2f}%", delta=f"{(metrics['mape_model']-metrics['mape_epias']):.2f}% vs EPIAS Forecast", delta_color="inverse")
+    col3.metric("XGBoost RMSE", f"{metrics['rmse_model']:.2f}", delta=f"{(metrics['rmse_model']-metrics['rmse_epias']):.2f} vs EPIAS Forecast", delta_color="inverse")
+
+    col1.info(f"EPIAS Forecast MAE: {metrics['mae_epias']:.2f}")
+    col2.info(f"EPIAS Forecast MAPE: {metrics['mape_epias']:.2f}%")
+    col3.info(f"EPIAS Forecast RMSE: {metrics['rmse_epias']:.2f}")
 
-if not data:
+
+monitoring = load_monitoring()
+
+if monitoring.empty:
     st.warning("No data found in monitoring database.")
 else:
-    records = []
-    for r in data:
-        records.append({
-            'date': r.date,
-            'Actual': r.actual_consumption,
-            'EPIAS Forecast': r.epias_forecast,
-            'Model Prediction': r.model_prediction
-        })
-    df = pd.DataFrame(records)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date')
-
+    first_ts, last_ts = monitoring['date'].min(), monitoring['date'].max()
     tab1, tab2 = st.tabs(["Daily View", "Cumulative View"])
 
     with tab1:
         st.header("Daily Performance")
         
-        available_dates = df['date'].dt.date.unique()
-        if len(available_dates) > 0:
-            default_date = available_dates[-1] if len(available_dates) > 1 else available_dates[-1]
-        else:
-            default_date = datetime.now().date() - timedelta(days=1)
-            
+        default_date = last_ts.date()
         min_allowed = datetime(2026, 2, 15).date()
         selected_date = st.date_input("Select Date", max(default_date, min_allowed), min_value=min_allowed)
         
-        daily_mask = (df['date'].dt.date == selected_date)
-        daily_df = df.loc[daily_mask]
+        daily_df = select_range(monitoring, selected_date, selected_date).rename(columns=DISPLAY_NAMES)
         
         if not daily_df.empty:
-            d_col1, d_col2, d_col3 = st.columns(3)
-            
-            valid_daily = daily_df.dropna()
+            daily_metrics = load_error_metrics(selected_date, selected_date)
             
-            if not valid_daily.empty:
-                d_mae_model = (valid_daily['Actual'] - valid_daily['Model Prediction']).abs().mean()
-                d_mae_epias = (valid_daily['Actual'] - valid_daily['EPIAS Forecast']).abs().mean()
-                
-                d_mape_model = ((valid_daily['Actual'] - valid_daily['Model Prediction']).abs() / valid_daily['Actual']).mean() * 100
-                d_mape_epias = ((valid_daily['Actual'] - valid_daily['EPIAS Forecast']).abs() / valid_daily['Actual']).mean() * 100
-                
-                d_rmse_model = ((valid_daily['Actual'] - valid_daily['Model Prediction']) ** 2).mean() ** 0.5
-                d_rmse_epias = ((valid_daily['Actual'] - valid_daily['EPIAS Forecast']) ** 2).mean() ** 0.5
-
-                d_col1.metric("XGBoost MAE", f"{d_mae_model:.2f}", delta=f"{(d_mae_model-d_mae_epias):.2f} vs EPIAS Forecast", delta_color="inverse")
-                d_col2.metric("XGBoost MAPE", f"{d_mape_model:.2f}%", delta=f"{(d_mape_model-d_mape_epias):.2f}% vs EPIAS Forecast", delta_color="inverse")
-                d_col3.metric("XGBoost RMSE", f"{d_rmse_model:.2f}", delta=f"{(d_rmse_model-d_rmse_epias):.2f} vs EPIAS Forecast", delta_color="inverse")
-                
-                d_col1.info(f"EPIAS Forecast MAE: {d_mae_epias:.2f}")
-                d_col2.info(f"EPIAS Forecast MAPE: {d_mape_epias:.2f}%")
-                d_col3.info(f"EPIAS Forecast RMSE: {d_rmse_epias:.2f}")
-
+            if daily_metrics['n'] > 0:
+                show_metrics(daily_metrics)
             else:
                 st.warning("Incomplete data for this date.")
 
@@ -100,44 +101,39 @@ else:
         st.header("Cumulative Performance")
         
         min_allowed = datetime(2026, 2, 15).date()
-        min_date = max(df['date'].min().date(), min_allowed)
-        max_date = df['date'].max().date()
+        min_date = max(first_ts.date(), min_allowed)
+        max_date = last_ts.date()
         
         date_range = st.date_input("Select Date Range", [min_date, max_date], min_value=min_allowed, key='cum_range')
         
         if len(date_range) == 2:
             start_d, end_d = date_range
-            mask = (df['date'].dt.date >= start_d) & (df['date'].dt.date <= end_d)
-            filtered_df = df.loc[mask]
         else:
-            filtered_df = df
+            start_d, end_d = None, None
             
-        valid_cum = filtered_df.dropna()
+        cum_metrics = load_error_metrics(start_d, end_d)
         
-        if not valid_cum.empty:
-            c_col1, c_col2, c_col3 = st.columns(3)
-            
-            c_mae_model = (valid_cum['Actual'] - valid_cum['Model Prediction']).abs().mean()
-            c_mae_epias = (valid_cum['Actual'] - valid_cum['EPIAS Forecast']).abs().mean()
-            c_mape_epias = ((valid_cum['Actual'] - valid_cum['EPIAS Forecast']).abs() / valid_cum['Actual']).mean() * 100
-            c_mape_model = ((valid_cum['Actual'] - valid_cum['Model Prediction']).abs() / valid_cum['Actual']).mean() * 100
-            c_rmse_epias = ((valid_cum['Actual'] - valid_cum['EPIAS Forecast']) ** 2).mean() ** 0.5
-            c_rmse_model = ((valid_cum['Actual'] - valid_cum['Model Prediction']) ** 2).mean() ** 0.5
-            
-            c_col1.metric("XGBoost MAE", f"{c_mae_model:.2f}", delta=f"{(c_mae_model-c_mae_epias):.2f} vs EPIAS Forecast", delta_color="inverse")
-            c_col2.metric("XGBoost MAPE", f"{c_mape_model:.2f}%", delta=f"{(c_mape_model-c_mape_epias):.2f}% vs EPIAS Forecast", delta_color="inverse")
-            c_col3.metric("XGBoost RMSE", f"{c_rmse_model:.2f}", delta=f"{(c_rmse_model-c_rmse_epias):.2f} vs EPIAS Forecast", delta_color="inverse")
+        if cum_metrics['n'] > 0:
+            show_metrics(cum_metrics)
             
-            c_col1.info(f"EPIAS Forecast MAE: {c_mae_epias:.2f}")
-            c_col2.info(f"EPIAS Forecast MAPE: {c_mape_epias:.2f}%")
-            c_col3.info(f"EPIAS Forecast RMSE: {c_rmse_epias:.2f}")
+            valid_cum = select_range(monitoring, start_d, end_d).dropna().rename(columns=DISPLAY_NAMES)
             
-            # Overall time series
+            # Overall time series; long ranges are downsampled server-side, narrow the range to see every hour
             st.subheader("Time Series Overview")
+            resolution = st.radio("Resolution", ["Auto", "Daily average", "Hourly"], horizontal=True, key='cum_resolution')
+            if resolution == "Daily average":
+                plot_df = daily_mean(valid_cum, list(DISPLAY_NAMES.values()))
+                traces = {name: plot_df for name in DISPLAY_NAMES.values()}
+            elif resolution == "Auto" and len(valid_cum) > DASHBOARD_MAX_POINTS:
+                traces = {name: lttb_trace(valid_cum, name, DASHBOARD_MAX_POINTS) for name in DISPLAY_NAMES.values()}
+                st.caption(f"Showing {DASHBOARD_MAX_POINTS} of {len(valid_cum)} hourly points per series. Narrow the date range for full resolution.")
+            else:
+                traces = {name: valid_cum for name in DISPLAY_NAMES.values()}
+
             fig_all = go.Figure()
-            fig_all.add_trace(go.Scatter(x=valid_cum['date'], y=valid_cum['Actual'], name='Actual', line=dict(color='#3498db', dash='dash', width=1)))
-            fig_all.add_trace(go.Scatter(x=valid_cum['date'], y=valid_cum['Model Prediction'], name='XGBoost Forecast', line=dict(color='#2ecc71', width=1)))
-            fig_all.add_trace(go.Scatter(x=valid_cum['date'], y=valid_cum['EPIAS Forecast'], name='EPIAS Forecast', line=dict(color='#e74c3c', width=1)))
+            fig_all.add_trace(go.Scattergl(x=traces['Actual']['date'], y=traces['Actual']['Actual'], name='Actual', line=dict(color='#3498db', dash='dash', width=1)))
+            fig_all.add_trace(go.Scattergl(x=traces['Model Prediction']['date'], y=traces['Model Prediction']['Model Prediction'], name='XGBoost Forecast', line=dict(color='#2ecc71', width=1)))
+            fig_all.add_trace(go.Scattergl(x=traces['EPIAS Forecast']['date'], y=traces['EPIAS Forecast']['EPIAS Forecast'], name='EPIAS Forecast', line=dict(color='#e74c3c', width=1)))
             fig_all.update_layout(xaxis_title="Date", yaxis_title="MWh", template="plotly_white")
             st.plotly_chart(fig_all, use_container_width=True)
         else:
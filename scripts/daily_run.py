@@ -1,116 +1,209 @@
+"""Fetch yesterday's consumption and EPIAS forecast, predict it, and store all three.
+
+    python scripts/daily_run.py                       # yesterday only
+    python scripts/daily_run.py --backfill            # fill gaps from the last BACKFILL_DAYS days
+    python scripts/daily_run.py --since 2026-02-15    # fill gaps from a given day to yesterday
+"""
+import argparse
+import json
 import logging
 import sys
 import os
 import pandas as pd
 from datetime import datetime, timedelta
-from sklearn.metrics import mean_absolute_error
 
 # Add parent directory to path for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.backtest import epias_forecast_frame
 from src.inference import InferencePipeline
 from src.data_loader import DataLoader
-from src.database import Database
+from src.database import Database, MONITORING_COLUMNS
+from src.profiling import profiler
+from src.store import contiguous_runs
+from src.config import PROFILE_REPORT_PATH, BACKFILL_DAYS
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def main():
+def main(since=None):
     logger.info("Starting daily run...")
-    
-    # 1. Setup
+
+    # 1. Setup (one loader, so one EPIAS login and one fetch per day for the whole run)
     db = Database()
     loader = DataLoader()
-    pipeline = InferencePipeline()
+    pipeline = InferencePipeline(data_loader=loader)
 
     if pipeline.model is None:
         logger.error("No model loaded. Exiting.")
         return
 
+    with loader.run_scope():
+        if since is None:
+            run(db, loader, pipeline)
+        else:
+            backfill(db, loader, pipeline, since)
+
+
+def monitoring_frame(actual_df: pd.DataFrame, epias_df: pd.DataFrame, pred_df: pd.DataFrame, days) -> pd.DataFrame:
+    """Merge actuals, the EPIAS plan and predictions into daily_monitoring rows for ``days``."""
+    days = set(days)
+    actual_df = actual_df[['date', 'consumption']].rename(columns={'consumption': 'actual_consumption'})
+
+    epias_df = epias_forecast_frame(epias_df)
+
+    pred_df = pred_df.rename(columns={'prediction': 'model_prediction'})
+
+    actual_df['date'] = pd.to_datetime(actual_df['date'].astype(str).str[:19])
+    if not epias_df.empty:
+        epias_df['date'] = pd.to_datetime(epias_df['date'].astype(str).str[:19])
+    pred_df['date'] = pd.to_datetime(pred_df['date'].astype(str).str[:19])
+
+    merged_df = pd.merge(actual_df, epias_df, on='date', how='outer')
+    merged_df = pd.merge(merged_df, pred_df, on='date', how='outer')
+    return merged_df[merged_df['date'].dt.date.isin(days)].reset_index(drop=True)
+
+
+def check_performance(db: Database, start_date, end_date):
+    """Log model vs EPIAS MAE from the daily_metrics rollup and alert when the model is far behind."""
+    metrics = db.get_error_metrics(start_date, end_date).iloc[0]
+
+    if metrics['n'] > 0:
+        mae_model = metrics['mae_model']
+        mae_epias = metrics['mae_epias']
+
+        logger.info(f"Model MAE: {mae_model:.2f} | EPIAS MAE: {mae_epias:.2f}")
+
+        if mae_model > 2 * mae_epias and mae_epias > 0:
+            logger.warning(f"Model performance alert! Model MAE ({mae_model:.2f}) is > 2x worse than EPIAS ({mae_epias:.2f})")
+    else:
+        logger.warning("Insufficient data for MAE comparison.")
+
+
+def run(db: Database, loader: DataLoader, pipeline: InferencePipeline):
+    """Predict, fetch and store yesterday's data inside the loader's run scope."""
     # 2. Target Date = Yesterday
     target_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
     logger.info(f"Processing data for: {target_date.date()}")
-    
+
     target_start = target_date
     target_end = target_date + timedelta(hours=23, minutes=59)
 
-    # 3. Fetch Data
+    # 3. Fetch Data (predict first: its history window covers the target day, which the memo then reuses)
+    logger.info("Generating model predictions...")
+    pred_df = pipeline.predict(target_date)
+
     logger.info("Fetching actual consumption...")
     actual_df = loader.get_realtime_consumption(target_start, target_end)
-    
+
     logger.info("Fetching EPIAS forecast...")
     epias_df = loader.get_load_estimation_plan(target_start, target_end)
-    
-    logger.info("Generating model predictions...")
-    pred_df = pipeline.predict(target_date)
 
     if actual_df.empty:
         logger.warning("No actual consumption data found.")
         return
 
     # 4. Standardize & Merge
-    actual_df = actual_df[['date', 'consumption']].rename(columns={'consumption': 'actual_consumption'})
-    
-    if not epias_df.empty:
-        # Find the forecast value column
-        if 'lep' in epias_df.columns:
-            epias_df = epias_df[['date', 'lep']].rename(columns={'lep': 'epias_forecast'})
-        else:
-            cols = [c for c in epias_df.columns if c not in ['date', 'time']]
-            if cols:
-                epias_df = epias_df[['date', cols[0]]].rename(columns={cols[0]: 'epias_forecast'})
-            else:
-                epias_df = pd.DataFrame(columns=['date', 'epias_forecast'])
-    else:
-        epias_df = pd.DataFrame(columns=['date', 'epias_forecast'])
+    merged_df = monitoring_frame(actual_df, epias_df, pred_df, [target_date.date()])
 
-    if not epias_df.empty:
-        epias_df['date'] = pd.to_datetime(epias_df['date'])
-        epias_df = epias_df[epias_df['date'].dt.date == target_date.date()]
+    # 5. Store in DB
+    logger.info("Saving to database...")
+    count = db.bulk_upsert_monitoring(merged_df)
+    logger.info(f"Saved {count} records.")
 
-    pred_df = pred_df.rename(columns={'prediction': 'model_prediction'})
+    # 6. Performance Check (read from the daily_metrics rollup updated by the upsert)
+    check_performance(db, target_date, target_date)
 
-    actual_df['date'] = pd.to_datetime(actual_df['date'].astype(str).str[:19])
-    if not epias_df.empty:
-        epias_df['date'] = pd.to_datetime(epias_df['date'].astype(str).str[:19])
-    pred_df['date'] = pd.to_datetime(pred_df['date'].astype(str).str[:19])
+    logger.info("Daily run completed.")
 
-    merged_df = pd.merge(actual_df, epias_df, on='date', how='outer')
-    merged_df = pd.merge(merged_df, pred_df, on='date', how='outer')
 
-    # 5. Store in DB
+def concat_runs(fetch, runs, columns) -> pd.DataFrame:
+    """Concatenate ``fetch(first, last)`` over runs of days; an empty frame with ``columns`` when there are none.
+
+    A run that fails is logged and skipped, so one bad range does not discard the others.
+    """
+    frames = []
+    for first, last in runs:
+        try:
+            df = fetch(pd.Timestamp(first), pd.Timestamp(last))
+        except Exception as e:
+            logger.error(f"{fetch.__name__} failed for {first}..{last}: {e}")
+            continue
+        if not df.empty:
+            frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def backfill(db: Database, loader: DataLoader, pipeline: InferencePipeline, since):
+    """Fill the gaps since ``since``: predict only days missing predictions, fetch only days missing actuals or plans.
+
+    Each contiguous run of such days is handled with one fetch or one predict call. A day EPIAS never
+    publishes stays a one-day fetch and does not pull the predictions back over the whole span.
+    """
+    yesterday = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    missing = db.get_missing_hours(since, yesterday) > 0
+    days = missing.index[missing.any(axis=1)]
+    if not len(days):
+        logger.info(f"No gaps between {pd.Timestamp(since).date()} and {yesterday.date()}.")
+        return
+
+    predict_ranges = contiguous_runs(list(missing.index[missing['model_prediction']]))
+    fetch_ranges = contiguous_runs(list(missing.index[missing[['actual_consumption', 'epias_forecast']].any(axis=1)]))
+    logger.info(f"Backfilling {len(days)} day(s) between {days[0]} and {days[-1]}: "
+                f"{len(predict_ranges)} range(s) to predict, {len(fetch_ranges)} to fetch...")
+
+    pred_df = concat_runs(pipeline.predict_range, predict_ranges, ['date', 'prediction'])
+    actual_df = concat_runs(loader.get_realtime_consumption, fetch_ranges, ['date', 'consumption'])
+    epias_df = concat_runs(loader.get_load_estimation_plan, fetch_ranges, ['date'])
+
+    if actual_df.empty and pred_df.empty:
+        logger.warning("No actual consumption or predictions found for the gaps.")
+        return
+
+    merged_df = monitoring_frame(actual_df, epias_df, pred_df, days)
+
+    # Only fill holes: values already stored (e.g. earlier predictions) are kept as they are
+    first_day, last_day = pd.Timestamp(days[0]), pd.Timestamp(days[-1])
+    stored = db.get_monitoring_frame(first_day, last_day).set_index('date')
+    if not stored.empty:
+        existing = stored.reindex(merged_df['date'])
+        for col in MONITORING_COLUMNS:
+            merged_df[col] = merged_df[col].where(existing[col].isna().to_numpy())
+    merged_df = merged_df.dropna(subset=MONITORING_COLUMNS, how='all')
+
     logger.info("Saving to database...")
-    count = 0
-    for _, row in merged_df.iterrows():
-        ts = row['date']
-        if isinstance(ts, pd.Timestamp):
-            ts = ts.to_pydatetime()
-            
-        act = row['actual_consumption'] if pd.notnull(row.get('actual_consumption')) else None
-        epi = row['epias_forecast'] if pd.notnull(row.get('epias_forecast')) else None
-        mod = row['model_prediction'] if pd.notnull(row.get('model_prediction')) else None
-        
-        db.upsert_monitoring_data(ts, act, epi, mod)
-        count += 1
+    count = db.bulk_upsert_monitoring(merged_df)
     logger.info(f"Saved {count} records.")
 
-    # 6. Performance Check
-    valid_data = merged_df.dropna()
-    
-    if not valid_data.empty:
-        mae_model = mean_absolute_error(valid_data['actual_consumption'], valid_data['model_prediction'])
-        mae_epias = mean_absolute_error(valid_data['actual_consumption'], valid_data['epias_forecast'])
-        
-        logger.info(f"Model MAE: {mae_model:.2f} | EPIAS MAE: {mae_epias:.2f}")
-        
-        if mae_model > 2 * mae_epias and mae_epias > 0:
-            logger.warning(f"Model performance alert! Model MAE ({mae_model:.2f}) is > 2x worse than EPIAS ({mae_epias:.2f})")
-    else:
-        logger.warning("Insufficient data for MAE comparison.")
+    check_performance(db, first_day, last_day)
+    logger.info("Backfill completed.")
 
-    logger.info("Daily run completed.")
+
+def log_timings():
+    report = profiler.report()
+    logger.info(f"Stage timings: {json.dumps(report['stages'])}")
+    if PROFILE_REPORT_PATH:
+        profiler.write_report(PROFILE_REPORT_PATH)
+        logger.info(f"Timing report written to {PROFILE_REPORT_PATH}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backfill', action='store_true', help=f"Fill gaps from the last {BACKFILL_DAYS} days instead of processing yesterday")
+    parser.add_argument('--since', default=None, help="Fill gaps from this day (YYYY-MM-DD) to yesterday; implies --backfill")
+    args = parser.parse_args()
+
+    if args.since:
+        return pd.Timestamp(args.since)
+    if args.backfill:
+        return pd.Timestamp(datetime.now().date()) - timedelta(days=BACKFILL_DAYS)
+    return None
 
 
 if __name__ == "__main__":
-    main()
+    since = parse_args()
+    try:
+        main(since)
+    finally:
+        log_timings()
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+
+import httpx
+import pandas as pd
+
+from src.config import (
+    EPIAS_USERNAME, EPIAS_PASSWORD, HISTORY_STORE_DIR,
+    EPIAS_MAX_WORKERS, EPIAS_TGT_TTL, HTTP_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF, WEATHER_LOCATIONS,
+)
+from src.data_loader import (
+    TGT_URL, CONSUMPTION_URL, LOAD_PLAN_URL, WEATHER_URL, RETRY_STATUSES,
+    month_chunks, chunk_body, chunk_items, tgt_from_response, items_to_frame, weather_params, weather_response_frame,
+)
+from src.profiling import profiler
+from src.store import HistoryStore, combine_frames
+from src.weather import weather_locations, location_source, weather_chunks, combine_locations
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDataLoader:
+    """Non-blocking counterpart of DataLoader for the API.
+
+    Uses one shared ``httpx.AsyncClient`` for keep-alive connections, bounds
+    concurrent upstream requests with a semaphore and retries 429/5xx
+    responses with exponential backoff. Reads the same local history store.
+    Request planning and response parsing are shared with DataLoader; only
+    the HTTP calls live here.
+    """
+
+    def __init__(self, store: HistoryStore = None, use_store: bool = True, locations: list = None):
+        self.username = EPIAS_USERNAME
+        self.password = EPIAS_PASSWORD
+        self.tgt = None
+        self.tgt_expires_at = 0.0
+        self.headers = {'Content-Type': 'application/json'}
+        self.client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=EPIAS_MAX_WORKERS * 2, max_keepalive_connections=EPIAS_MAX_WORKERS),
+        )
+        self._slots = asyncio.Semaphore(EPIAS_MAX_WORKERS)
+        self._tgt_lock = asyncio.Lock()
+
+        if store is None and use_store and HISTORY_STORE_DIR:
+            store = HistoryStore()
+        self.store = store if use_store else None
+        self.weather_locations = locations or weather_locations(WEATHER_LOCATIONS)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying 429/5xx and transport errors with backoff."""
+        for attempt in range(HTTP_RETRIES + 1):
+            try:
+                async with self._slots:
+                    response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == HTTP_RETRIES:
+                    return response
+            except httpx.TransportError:
+                if attempt == HTTP_RETRIES:
+                    raise
+            await asyncio.sleep(HTTP_BACKOFF * (2 ** attempt))
+
+    async def _get_tgt(self, stale: str = None):
+        """Authenticate with EPIAS unless a valid ticket other than ``stale`` is already held."""
+        async with self._tgt_lock:
+            if self.tgt and self.tgt != stale and time.monotonic() < self.tgt_expires_at:
+                return
+            response = await self._request("POST", TGT_URL, data={'username': self.username, 'password': self.password})
+            self.tgt = tgt_from_response(response)
+            self.tgt_expires_at = time.monotonic() + EPIAS_TGT_TTL
+            self.headers['TGT'] = self.tgt
+
+    async def _fetch_chunk(self, url: str, start_str: str, end_str: str, label: str) -> list:
+        month = start_str[:7]
+        try:
+            tgt = self.tgt
+            body = chunk_body(start_str, end_str)
+            resp = await self._request("POST", url, headers=self.headers, json=body)
+            if resp.status_code == 401:
+                await self._get_tgt(stale=tgt)
+                resp = await self._request("POST", url, headers=self.headers, json=body)
+            return chunk_items(resp, label, month)
+        except Exception as e:
+            logger.error(f"Exception fetching {label} for {month}: {e}")
+        return []
+
+    async def _fetch_monthly(self, url: str, start_date, end_date, label: str) -> pd.DataFrame:
+        await self._get_tgt()
+
+        chunks = month_chunks(start_date, end_date)
+        # gather() returns results in argument order, so months stay sorted
+        results = await asyncio.gather(*[self._fetch_chunk(url, s, e, label) for s, e in chunks])
+        return items_to_frame([item for items in results for item in items])
+
+    async def _fetch_weather(self, start_date, end_date, location: tuple = None) -> pd.DataFrame:
+        location = location or self.weather_locations[0]
+        chunks = weather_chunks(start_date, end_date)
+        frames = await asyncio.gather(*[self._fetch_weather_chunk(s, e, location) for s, e in chunks])
+        return combine_frames(list(frames))
+
+    async def _fetch_weather_chunk(self, start_date, end_date, location: tuple) -> pd.DataFrame:
+        name, lat, lon, _ = location
+        params = weather_params(start_date, end_date, lat, lon)
+        try:
+            return weather_response_frame(await self._request("GET", WEATHER_URL, params=params))
+        except Exception as e:
+            logger.error(f"Error fetching {name} weather for {params['start_date']}..{params['end_date']}: {e}")
+            return pd.DataFrame()
+
+    async def _fetch_with_store(self, source: str, fetch, start_date, end_date) -> pd.DataFrame:
+        if self.store is None:
+            return await fetch(start_date, end_date)
+
+        # The store does parquet and filesystem I/O, so it runs in a thread to keep the event loop free
+        stored_days, missing_runs = await asyncio.to_thread(self.store.plan, source, start_date, end_date)
+        fetched = await asyncio.gather(*[fetch(pd.Timestamp(s), pd.Timestamp(e)) for s, e in missing_runs])
+        return await asyncio.to_thread(self.store.merge, source, stored_days, list(fetched))
+
+    async def get_realtime_consumption(self, start_date, end_date) -> pd.DataFrame:
+        with profiler.timer("fetch.consumption"):
+            return await self._get_realtime_consumption(start_date, end_date)
+
+    async def _get_realtime_consumption(self, start_date, end_date) -> pd.DataFrame:
+        fetch = lambda s, e: self._fetch_monthly(CONSUMPTION_URL, s, e, label="consumption")
+        return await self._fetch_with_store("consumption", fetch, start_date, end_date)
+
+    async def get_load_estimation_plan(self, start_date, end_date) -> pd.DataFrame:
+        with profiler.timer("fetch.load_estimation_plan"):
+            return await self._get_load_estimation_plan(start_date, end_date)
+
+    async def _get_load_estimation_plan(self, start_date, end_date) -> pd.DataFrame:
+        fetch = lambda s, e: self._fetch_monthly(LOAD_PLAN_URL, s, e, label="load estimation plan")
+        return await self._fetch_with_store("load_estimation_plan", fetch, start_date, end_date)
+
+    async def get_weather_forecast(self, start_date, end_date) -> pd.DataFrame:
+        with profiler.timer("fetch.weather"):
+            return await self._get_weather_forecast(start_date, end_date)
+
+    async def _get_weather_forecast(self, start_date, end_date) -> pd.DataFrame:
+        frames = await asyncio.gather(*[
+            self._fetch_with_store(location_source(loc), lambda s, e, loc=loc: self._fetch_weather(s, e, loc), start_date, end_date)
+            for loc in self.weather_locations
+        ])
+        return combine_locations(list(frames), self.weather_locations)
@@ -0,0 +1,199 @@
+"""Rolling-origin backtest of the day-ahead model over historical data.
+
+History is loaded once and features are built once for the whole range.
+Lag and rolling features only look 48 hours or more into the past, so every
+row matches what ``InferencePipeline.predict`` would have produced for that
+day. Rows are then scored in day-aligned chunks across worker processes that
+share one float32 feature matrix through shared memory.
+
+    python -m src.backtest --start 2025-01-01 --end 2025-12-31 \\
+        --consumption-csv notebook/epias_data_2022-2025.csv \\
+        --epias-csv notebook/epias_2025_comparison.csv --workers 4 --output backtest/
+"""
+import os
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.config import FEATURE_COLUMNS, MODEL_PATH
+from src.data_loader import DataLoader
+from src.features import FeatureEngineer
+from src.metrics import error_summary
+from src.model_backend import load_model
+from src.store import to_day
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = 10
+FORECASTS = {'model': 'prediction', 'epias': 'epias_forecast'}
+
+_worker = {}
+
+
+def _init_worker(shm_name: str, shape: tuple, model_path: str):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    booster = load_model(model_path).get_booster()
+    booster.set_param({'nthread': 1})
+    _worker.update(shm=shm, booster=booster, X=np.ndarray(shape, dtype=np.float32, buffer=shm.buf))
+
+
+def _predict_rows(bounds: tuple):
+    lo, hi = bounds
+    return lo, _worker['booster'].inplace_predict(_worker['X'][lo:hi])
+
+
+def read_series_csv(path: str, value_column: str = None) -> pd.DataFrame:
+    """Read a ``date,<value>`` CSV into a frame with a tz-aware Istanbul ``date`` column."""
+    df = pd.read_csv(path)
+    df['date'] = pd.to_datetime(df['date'], utc=True).dt.tz_convert("Europe/Istanbul")
+    if value_column:
+        other = [c for c in df.columns if c != 'date']
+        df = df[['date', other[0]]].rename(columns={other[0]: value_column})
+    return df
+
+
+def epias_forecast_frame(epias_df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize an EPIAS load estimation plan frame to ``date, epias_forecast``."""
+    if epias_df.empty:
+        return pd.DataFrame(columns=['date', 'epias_forecast'])
+    if 'lep' in epias_df.columns:
+        return epias_df[['date', 'lep']].rename(columns={'lep': 'epias_forecast'})
+    cols = [c for c in epias_df.columns if c not in ['date', 'time']]
+    if not cols:
+        return pd.DataFrame(columns=['date', 'epias_forecast'])
+    return epias_df[['date', cols[0]]].rename(columns={cols[0]: 'epias_forecast'})
+
+
+class Backtester:
+    def __init__(self, model_path: str = None, data_loader: DataLoader = None):
+        self.model_path = model_path or MODEL_PATH
+        self.model = load_model(self.model_path)
+        self.data_loader = data_loader or DataLoader()
+        self.feature_engineer = FeatureEngineer()
+
+    def load_history(self, start_day, end_day, consumption_csv: str = None):
+        history_start = start_day - timedelta(days=HISTORY_DAYS)
+        if consumption_csv:
+            consumption_df = read_series_csv(consumption_csv, value_column='consumption')
+            days = consumption_df['date'].dt.date
+            consumption_df = consumption_df[(days >= history_start.date()) & (days <= end_day.date())]
+        else:
+            consumption_df = self.data_loader.get_realtime_consumption(history_start, end_day)
+
+        if consumption_df.empty:
+            raise ValueError("No consumption data for the backtest range.")
+
+        forecast_df = self.data_loader.get_weather_forecast(history_start, end_day)
+        return consumption_df, forecast_df
+
+    def load_epias(self, start_day, end_day, epias_csv: str = None) -> pd.DataFrame:
+        if epias_csv:
+            return read_series_csv(epias_csv, value_column='epias_forecast')
+        return epias_forecast_frame(self.data_loader.get_load_estimation_plan(start_day, end_day))
+
+    def predict_matrix(self, X: np.ndarray, day_bounds: list, workers: int) -> np.ndarray:
+        """Score X in day-aligned chunks, in-process or across ``workers`` processes."""
+        if workers <= 1 or len(day_bounds) < 2:
+            return self.model.get_booster().inplace_predict(X)
+
+        chunks = np.array_split(np.arange(len(day_bounds)), workers)
+        bounds = [(day_bounds[c[0]][0], day_bounds[c[-1]][1]) for c in chunks if len(c)]
+
+        shm = shared_memory.SharedMemory(create=True, size=X.nbytes)
+        try:
+            shared = np.ndarray(X.shape, dtype=np.float32, buffer=shm.buf)
+            shared[:] = X
+            predictions = np.empty(len(X), dtype=np.float32)
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(shm.name, X.shape, self.model_path)
+            ) as executor:
+                for lo, preds in executor.map(_predict_rows, bounds):
+                    predictions[lo:lo + len(preds)] = preds
+            return predictions
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def run(self, start_date, end_date, workers: int = 1, consumption_csv: str = None,
+            epias_csv: str = None, with_epias: bool = True) -> dict:
+        start_day, end_day = pd.Timestamp(to_day(start_date)), pd.Timestamp(to_day(end_date))
+        consumption_df, forecast_df = self.load_history(start_day, end_day, consumption_csv)
+
+        features = self.feature_engineer.process_data(consumption_df, forecast_df)
+        days = features.index.date
+        features = features.loc[(days >= start_day.date()) & (days <= end_day.date())]
+        if features.empty:
+            raise ValueError("No rows to score in the backtest range.")
+
+        X = np.ascontiguousarray(features[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+        day_codes = pd.factorize(features.index.date)[0]
+        edges = np.flatnonzero(np.diff(day_codes)) + 1
+        starts, ends = np.r_[0, edges], np.r_[edges, len(X)]
+        predictions = self.predict_matrix(X, list(zip(starts, ends)), workers)
+
+        hourly = pd.DataFrame({
+            'date': features.index,
+            'actual': features['consumption'].to_numpy(dtype=np.float64),
+            'prediction': predictions,
+        })
+
+        forecasts = {'model': 'prediction'}
+        if with_epias:
+            epias = self.load_epias(start_day, end_day, epias_csv)
+            if not epias.empty:
+                epias = epias.drop_duplicates(subset=['date']).set_index('date')['epias_forecast']
+                hourly['epias_forecast'] = epias.reindex(pd.DatetimeIndex(hourly['date'])).to_numpy()
+                forecasts = FORECASTS
+
+        hourly['day'] = hourly['date'].dt.date
+        hourly['month'] = hourly['date'].dt.strftime('%Y-%m')
+        hourly['hour'] = hourly['date'].dt.hour
+
+        return {
+            'hourly': hourly,
+            'overall': error_summary(hourly, forecasts=forecasts),
+            'daily': error_summary(hourly, by='day', forecasts=forecasts),
+            'monthly': error_summary(hourly, by='month', forecasts=forecasts),
+            'hour_of_day': error_summary(hourly, by='hour', forecasts=forecasts),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--start', required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument('--end', required=True, help="Last day (inclusive), YYYY-MM-DD")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--model', default=None)
+    parser.add_argument('--consumption-csv', default=None, help="Local date,consumption snapshot instead of EPIAS")
+    parser.add_argument('--epias-csv', default=None, help="Local date,<forecast> file instead of the EPIAS plan")
+    parser.add_argument('--no-epias', action='store_true', help="Skip the EPIAS comparison")
+    parser.add_argument('--output', default=None, help="Directory for hourly/daily/monthly/hour_of_day CSVs")
+    args = parser.parse_args()
+
+    backtester = Backtester(model_path=args.model)
+    results = backtester.run(
+        args.start, args.end, workers=args.workers, consumption_csv=args.consumption_csv,
+        epias_csv=args.epias_csv, with_epias=not args.no_epias,
+    )
+
+    pd.set_option('display.width', 160)
+    print("Overall:")
+    print(results['overall'].round(2).to_string(index=False))
+    print("\nMonthly:")
+    print(results['monthly'].round(2).to_string())
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        for name, frame in results.items():
+            frame.to_csv(os.path.join(args.output, f"{name}.csv"), index=name != 'hourly')
+        logger.info(f"Backtest results written to {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,189 @@
+import io
+import asyncio
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future
+
+import pandas as pd
+
+from src.config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_DB
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCache:
+    """LRU + TTL cache for prediction frames, keyed on target date and model fingerprint.
+
+    Concurrent requests for the same key share one in-flight computation. An
+    optional SQLite file acts as a second tier that survives restarts. Keys
+    include the model fingerprint, so entries of a replaced model are never
+    served and simply age out of the LRU and TTL.
+    """
+
+    def __init__(self, max_size: int = None, ttl: float = None, db_path: str = None):
+        self.max_size = max_size or PREDICTION_CACHE_SIZE
+        self.ttl = PREDICTION_CACHE_TTL if ttl is None else ttl
+        self.db_path = PREDICTION_CACHE_DB if db_path is None else db_path
+
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._async_inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS prediction_cache "
+                    "(key TEXT PRIMARY KEY, created REAL NOT NULL, payload BLOB NOT NULL)"
+                )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(target_date, fingerprint: str) -> str:
+        return f"{pd.Timestamp(target_date).date().isoformat()}:{fingerprint}"
+
+    def _get_memory(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created, value = entry
+        if time.monotonic() - created > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_memory(self, key: str, value: pd.DataFrame):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _get_disk(self, key: str):
+        if not self.db_path:
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT created, payload FROM prediction_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        return pd.read_parquet(io.BytesIO(row[1]))
+
+    def _put_disk(self, key: str, value: pd.DataFrame):
+        if not self.db_path:
+            return
+        buf = io.BytesIO()
+        value.to_parquet(buf, index=False)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO prediction_cache (key, created, payload) VALUES (?, ?, ?)",
+                (key, time.time(), buf.getvalue()),
+            )
+
+    def get_or_compute(self, target_date, fingerprint: str, compute) -> pd.DataFrame:
+        """Return the cached frame for the key, or run ``compute`` once for all concurrent callers."""
+        key = self.make_key(target_date, fingerprint)
+
+        with self._lock:
+            value = self._get_memory(key)
+            if value is not None:
+                self.stats["hits"] += 1
+                return value.copy()
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            return future.result().copy()
+
+        try:
+            value = self._get_disk(key)
+            if value is not None:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+            else:
+                with self._lock:
+                    self.stats["misses"] += 1
+                value = compute()
+                self._put_disk(key, value)
+
+            with self._lock:
+                self._put_memory(key, value)
+            future.set_result(value)
+            return value.copy()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_compute(self, target_date, fingerprint: str, compute) -> pd.DataFrame:
+        """Async variant of ``get_or_compute``; ``compute`` is a coroutine function."""
+        key = self.make_key(target_date, fingerprint)
+
+        with self._lock:
+            value = self._get_memory(key)
+            if value is not None:
+                self.stats["hits"] += 1
+                return value.copy()
+
+            future = self._async_inflight.get(key)
+            owner = future is None
+            if owner:
+                future = asyncio.get_running_loop().create_future()
+                self._async_inflight[key] = future
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            # shield so one waiter timing out does not cancel the shared result
+            return (await asyncio.shield(future)).copy()
+
+        try:
+            value = await asyncio.to_thread(self._get_disk, key)
+            if value is not None:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+            else:
+                with self._lock:
+                    self.stats["misses"] += 1
+                value = await compute()
+                await asyncio.to_thread(self._put_disk, key, value)
+
+            with self._lock:
+                self._put_memory(key, value)
+            future.set_result(value)
+            return value.copy()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark as retrieved when nobody else is waiting
+            raise
+        finally:
+            with self._lock:
+                self._async_inflight.pop(key, None)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "ttl": self.ttl, **self.stats}
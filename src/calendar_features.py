@@ -0,0 +1,139 @@
+"""Daily calendar table for Turkey: public holidays, Ramadan, Kurban and bridge days.
+
+The table is built once per process for a padded year span (lazily, on first
+use) and hourly frames pick their rows with a single positional lookup on
+the local calendar day.
+
+Ramadan and Kurban come from the curated ranges below where they exist. For
+other years Kurban is taken from the ``holidays`` package and Ramadan is
+approximated as the 30 days before Ramazan Bayramı.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+TIMEZONE = "Europe/Istanbul"
+NS_PER_DAY = 86_400 * 10**9
+
+# The table always covers at least these years; other spans widen it
+FIRST_YEAR = 2015
+LAST_YEAR = 2035
+
+# Days-to/after-holiday are capped so far-off holidays do not dominate the scale
+MAX_HOLIDAY_DISTANCE = 30
+
+RAMADAN_DATES = [
+    ("2022-04-02", "2022-05-01"),
+    ("2023-03-23", "2023-04-20"),
+    ("2024-03-11", "2024-04-09"),
+    ("2025-03-01", "2025-03-29"),
+    ("2026-02-18", "2026-03-19"),
+    ("2027-02-08", "2027-03-08"),
+]
+
+KURBAN_DATES = [
+    ("2022-07-09", "2022-07-12"),
+    ("2023-06-28", "2023-07-01"),
+    ("2024-06-17", "2024-06-20"),
+    ("2025-06-06", "2025-06-09"),
+    ("2026-05-26", "2026-05-29"),
+    ("2027-05-16", "2027-05-19"),
+]
+
+CALENDAR_COLUMNS = ['is_holiday', 'is_ramadan', 'is_kurban', 'is_bridge', 'days_to_holiday', 'days_after_holiday']
+
+
+def expand_ranges(ranges) -> pd.DatetimeIndex:
+    days = [pd.date_range(start, end) for start, end in ranges]
+    return days[0].append(days[1:]) if days else pd.DatetimeIndex([])
+
+
+def _religious_days(official):
+    """Ramadan and Kurban days: curated ranges, filled in from ``holidays`` for other years."""
+    ramadan = expand_ranges(RAMADAN_DATES)
+    kurban = expand_ranges(KURBAN_DATES)
+    curated_ramadan, curated_kurban = set(ramadan.year), set(kurban.year)
+
+    extra_ramadan, extra_kurban = [], []
+    previous_eid_day = None
+    for day, name in sorted(official.items()):
+        if "Kurban Bayramı" in name and day.year not in curated_kurban:
+            extra_kurban.append(pd.Timestamp(day))
+        if "Ramazan Bayramı" in name and day.year not in curated_ramadan:
+            eid = pd.Timestamp(day)
+            # Only the first day of each Bayram starts a new Ramadan range
+            if previous_eid_day is None or eid - previous_eid_day > pd.Timedelta(days=1):
+                extra_ramadan.append((eid - pd.Timedelta(days=30), eid - pd.Timedelta(days=1)))
+            previous_eid_day = eid
+
+    ramadan = ramadan.append(expand_ranges(extra_ramadan)).unique()
+    kurban = kurban.append(pd.DatetimeIndex(extra_kurban)).unique()
+    return ramadan, kurban
+
+
+def _distance(days: np.ndarray, marks: np.ndarray, forward: bool) -> np.ndarray:
+    """Days until the next (``forward``) or since the previous marked day, capped."""
+    if not len(marks):
+        return np.full(len(days), MAX_HOLIDAY_DISTANCE, dtype=np.int64)
+    if forward:
+        pos = np.searchsorted(marks, days, side='left')
+        nearest = marks[np.minimum(pos, len(marks) - 1)]
+        dist = np.where(pos < len(marks), nearest - days, MAX_HOLIDAY_DISTANCE)
+    else:
+        pos = np.searchsorted(marks, days, side='right') - 1
+        nearest = marks[np.maximum(pos, 0)]
+        dist = np.where(pos >= 0, days - nearest, MAX_HOLIDAY_DISTANCE)
+    return np.minimum(dist, MAX_HOLIDAY_DISTANCE)
+
+
+@lru_cache(maxsize=8)
+def calendar_table(first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR) -> pd.DataFrame:
+    """One row per day from ``first_year`` to ``last_year`` with the calendar features."""
+    import holidays
+
+    days = pd.date_range(f"{first_year}-01-01", f"{last_year}-12-31", freq='D')
+    # One extra year on each side so distances near the edges are right
+    official = holidays.Turkey(years=range(first_year - 1, last_year + 2))
+    holiday_days = pd.DatetimeIndex(sorted(official.keys()))
+    ramadan, kurban = _religious_days(official)
+
+    is_holiday = days.isin(holiday_days)
+    off = is_holiday | (days.dayofweek >= 5)
+    prev_off = np.r_[True, off[:-1]]
+    next_off = np.r_[off[1:], True]
+    prev_holiday = np.r_[False, is_holiday[:-1]]
+    next_holiday = np.r_[is_holiday[1:], False]
+    # A working day squeezed between days off, at least one of them a holiday
+    is_bridge = ~off & prev_off & next_off & (prev_holiday | next_holiday)
+
+    day_numbers = days.asi8 // NS_PER_DAY
+    holiday_numbers = np.unique(holiday_days.asi8 // NS_PER_DAY)
+
+    return pd.DataFrame({
+        'is_holiday': is_holiday.astype(np.int64),
+        'is_ramadan': days.isin(ramadan).astype(np.int64),
+        'is_kurban': days.isin(kurban).astype(np.int64),
+        'is_bridge': is_bridge.astype(np.int64),
+        'days_to_holiday': _distance(day_numbers, holiday_numbers, forward=True),
+        'days_after_holiday': _distance(day_numbers, holiday_numbers, forward=False),
+    }, index=days.rename('day'))
+
+
+def calendar_columns(index: pd.DatetimeIndex, columns: list = None) -> dict:
+    """Calendar features for a tz-aware hourly index, looked up by local day in one ``take``."""
+    columns = columns or CALENDAR_COLUMNS
+    if not len(index):
+        return {col: np.zeros(0, dtype=np.int64) for col in columns}
+
+    local_days = index.tz_convert(TIMEZONE).tz_localize(None).normalize() if index.tz is not None else index.normalize()
+    valid = ~local_days.isna()
+    if not valid.any():
+        return {col: np.zeros(len(index), dtype=np.int64) for col in columns}
+
+    years = local_days[valid].year
+    table = calendar_table(min(FIRST_YEAR, int(years.min())), max(LAST_YEAR, int(years.max())))
+
+    # Unparseable (NaT) hours get day 0 of the table and are zeroed afterwards
+    positions = np.where(valid, local_days.asi8 // NS_PER_DAY - table.index[0].value // NS_PER_DAY, 0)
+    return {col: np.where(valid, table[col].to_numpy().take(positions), 0) for col in columns}
@@ -13,6 +13,60 @@ FEATURE_COLUMNS = [
 TARGET_COLUMN = 'consumption'
 
 MODEL_PATH = os.getenv("MODEL_PATH", "model.json")
+TUNING_LOG_PATH = os.getenv("TUNING_LOG_PATH", "tuning_trials.csv")
+# One of "sklearn" (XGBRegressor.predict), "inplace" (Booster.inplace_predict) or "numpy" (flattened trees)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "inplace")
+# Versioned models (src/registry.py); when it holds no versions MODEL_PATH is served. Empty disables it.
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "models")
 DATABASE_URL = os.getenv("SUPABASE_DB_URL", "sqlite:///monitoring.db")
 EPIAS_USERNAME = os.getenv("EPIAS_USERNAME")
 EPIAS_PASSWORD = os.getenv("EPIAS_PASSWORD")
+
+# API
+BATCH_MAX_DAYS = int(os.getenv("BATCH_MAX_DAYS", "366"))
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "16"))
+API_MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", "32"))
+API_CPU_WORKERS = int(os.getenv("API_CPU_WORKERS", str(os.cpu_count() or 2)))
+API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "60"))
+# Seconds between checks for a new or pinned model version (0 disables hot reload)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "60"))
+# Required in the X-Admin-Token header of /admin endpoints; they are disabled while unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Prediction cache (set PREDICTION_CACHE_DB to a file path to enable the SQLite tier)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "256"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+PREDICTION_CACHE_DB = os.getenv("PREDICTION_CACHE_DB", "")
+
+# HTTP fetching (the URLs can point at a staging or local stand-in server)
+EPIAS_AUTH_URL = os.getenv("EPIAS_AUTH_URL", "https://giris.epias.com.tr/cas/v1/tickets")
+EPIAS_API_URL = os.getenv("EPIAS_API_URL", "https://seffaflik.epias.com.tr/electricity-service/v1")
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "https://historical-forecast-api.open-meteo.com/v1/forecast")
+# EPIAS tickets (TGT) are valid for two hours; renew a little earlier
+EPIAS_TGT_TTL = float(os.getenv("EPIAS_TGT_TTL", "6600"))
+EPIAS_MAX_WORKERS = int(os.getenv("EPIAS_MAX_WORKERS", "6"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "1.0"))
+
+# Local history store (set HISTORY_STORE_DIR to an empty string to disable)
+HISTORY_STORE_DIR = os.getenv("HISTORY_STORE_DIR", "data/history")
+HISTORY_MUTABLE_DAYS = int(os.getenv("HISTORY_MUTABLE_DAYS", "2"))
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", "data/features")
+
+# daily_run --backfill looks this many days back for missing monitoring rows
+BACKFILL_DAYS = int(os.getenv("BACKFILL_DAYS", "30"))
+
+# Dashboard (seconds between incremental reloads, and the point budget per plotted trace)
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "300"))
+DASHBOARD_MAX_POINTS = int(os.getenv("DASHBOARD_MAX_POINTS", "2000"))
+
+# Profiling (stage timers and counters; PROFILE_REPORT_PATH is where daily_run writes its JSON report)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "1") == "1"
+PROFILE_REPORT_PATH = os.getenv("PROFILE_REPORT_PATH", "")
+
+# Weather (WEATHER_LOCATIONS is a set name from src/weather.py: "central" or "cities")
+WEATHER_LOCATIONS = os.getenv("WEATHER_LOCATIONS", "central")
+WEATHER_MODEL = os.getenv("WEATHER_MODEL", "gfs_seamless")
+WEATHER_CHUNK_DAYS = int(os.getenv("WEATHER_CHUNK_DAYS", "92"))
+WEATHER_MAX_WORKERS = int(os.getenv("WEATHER_MAX_WORKERS", "4"))
@@ -0,0 +1,88 @@
+"""Data layer for the Streamlit dashboard: an incrementally refreshed monitoring frame and downsampling.
+
+Kept free of Streamlit so it can be reused and benchmarked; ``dashboard/app.py``
+wraps it in ``st.cache_resource`` / ``st.cache_data``.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.database import Database, MONITORING_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Rows this close to the newest cached hour are re-read on refresh, since actuals
+# and forecasts for the latest days are filled in by later daily runs.
+REFRESH_OVERLAP = timedelta(days=2)
+
+
+class MonitoringFrameCache:
+    """The full hourly monitoring table in memory, topped up with only the newest rows."""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.frame = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> pd.DataFrame:
+        with self._lock:
+            if self.frame is None or self.frame.empty:
+                self.frame = self.db.get_monitoring_frame()
+                logger.info(f"Loaded {len(self.frame)} monitoring rows")
+                return self.frame
+
+            since = self.frame['date'].max().normalize() - REFRESH_OVERLAP
+            fresh = self.db.get_monitoring_frame(since=since)
+            kept = self.frame[self.frame['date'] < since]
+            self.frame = pd.concat([kept, fresh], ignore_index=True)
+            logger.info(f"Refreshed {len(fresh)} monitoring rows since {since}")
+            return self.frame
+
+
+def select_range(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """Rows of ``df`` within an inclusive day range."""
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= (df['date'] >= pd.Timestamp(start).normalize()).to_numpy()
+    if end is not None:
+        mask &= (df['date'] < pd.Timestamp(end).normalize() + timedelta(days=1)).to_numpy()
+    return df[mask]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: positions of ``n_out`` points that keep the visual shape of (x, y)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
+
+
+def lttb_trace(df: pd.DataFrame, column: str, n_out: int) -> pd.DataFrame:
+    """``date`` and ``column`` downsampled with LTTB, skipping missing values."""
+    series = df[['date', column]].dropna()
+    x = series['date'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+    return series.iloc[lttb_indices(x, series[column].to_numpy(), n_out)]
+
+
+def daily_mean(df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+    """Daily averages of the monitoring columns."""
+    columns = columns or [c for c in MONITORING_COLUMNS if c in df.columns]
+    return df.set_index('date')[columns].resample('D').mean().dropna(how='all').reset_index()
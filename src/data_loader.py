@@ -1,126 +1,293 @@
 import os
 import logging
+import threading
+import time
 import requests
 import pandas as pd
 import calendar
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import timedelta
-from src.config import EPIAS_USERNAME, EPIAS_PASSWORD
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.config import (
+    EPIAS_USERNAME, EPIAS_PASSWORD, HISTORY_STORE_DIR,
+    EPIAS_MAX_WORKERS, EPIAS_TGT_TTL, HTTP_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF,
+    WEATHER_LOCATIONS, WEATHER_MODEL, WEATHER_MAX_WORKERS,
+    EPIAS_AUTH_URL, EPIAS_API_URL, WEATHER_API_URL,
+)
+from src.profiling import profiler, timed
+from src.store import HistoryStore, FetchMemo, combine_frames
+from src.weather import weather_locations, location_source, weather_chunks, combine_locations
 
 logger = logging.getLogger(__name__)
 
+TGT_URL = EPIAS_AUTH_URL
+CONSUMPTION_URL = f"{EPIAS_API_URL}/consumption/data/realtime-consumption"
+LOAD_PLAN_URL = f"{EPIAS_API_URL}/consumption/data/load-estimation-plan"
+WEATHER_URL = WEATHER_API_URL
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def items_to_frame(items: list) -> pd.DataFrame:
+    """EPIAS response items to a frame with a tz-aware Istanbul ``date`` column."""
+    df = pd.DataFrame(items)
+    if not df.empty:
+        df['date'] = pd.to_datetime(df['date'], utc=True).dt.tz_convert("Europe/Istanbul")
+    return df
+
+
+def month_chunks(start_date, end_date) -> list:
+    """Split a date range into (start, end) EPIAS request windows, one per calendar month."""
+    chunks = []
+    current_date = start_date
+
+    while current_date <= end_date:
+        year = current_date.year
+        month = current_date.month
+        last_day = calendar.monthrange(year, month)[1]
+
+        month_end = pd.Timestamp(year, month, last_day)
+        if month_end > end_date:
+            month_end = end_date
+
+        start_str = f"{year}-{month:02d}-{current_date.day:02d}T00:00:00+03:00"
+        end_str = f"{year}-{month:02d}-{month_end.day:02d}T23:59:59+03:00"
+        chunks.append((start_str, end_str))
+
+        current_date = month_end + timedelta(days=1)
+    return chunks
+
+
+def chunk_body(start_str: str, end_str: str) -> dict:
+    return {"startDate": start_str, "endDate": end_str}
+
+
+def tgt_from_response(response) -> str:
+    """The ticket from an EPIAS authentication response (requests or httpx)."""
+    if response.status_code != 201:
+        raise Exception(f"Failed to get TGT: {response.status_code}, {response.text}")
+    profiler.count("fetch.auth")
+    return response.headers['Location'].split('/')[-1]
+
+
+def chunk_items(response, label: str, month: str) -> list:
+    """Items of one EPIAS month-chunk response (requests or httpx); empty on an error status."""
+    if response.status_code != 200:
+        logger.warning(f"Error fetching {label} for {month}: {response.status_code}")
+        return []
+    items = response.json().get('items', [])
+    profiler.count("fetch.bytes", len(response.content))
+    profiler.count("fetch.records", len(items))
+    logger.info(f"Fetched {label} for {month}: {len(items)} records")
+    return items
+
+
+def weather_params(start_date, end_date, latitude: float = 39.0, longitude: float = 35.0, model: str = None) -> dict:
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "hourly": "temperature_2m",
+        "models": model or WEATHER_MODEL,
+        "timezone": "Europe/Istanbul"
+    }
+
+
+def weather_to_frame(data: dict) -> pd.DataFrame:
+    """Open-Meteo hourly payload to a frame with ``date`` and ``forecast_temp``."""
+    hourly_data = data.get("hourly", {})
+    
+    forecast_df = pd.DataFrame({
+        "date": hourly_data.get("time", []),
+        "forecast_temp": hourly_data.get("temperature_2m", [])
+    })
+    
+    forecast_df["date"] = pd.to_datetime(forecast_df["date"])
+    
+    if forecast_df["date"].dt.tz is None:
+         forecast_df["date"] = forecast_df["date"].dt.tz_localize("Europe/Istanbul", ambiguous='NaT', nonexistent='shift_forward')
+    else:
+         forecast_df["date"] = forecast_df["date"].dt.tz_convert("Europe/Istanbul")
+
+    return forecast_df
+
+
+def weather_response_frame(response) -> pd.DataFrame:
+    """Forecast frame of one Open-Meteo response (requests or httpx); raises on an error status."""
+    response.raise_for_status()
+    df = weather_to_frame(response.json())
+    profiler.count("fetch.bytes", len(response.content))
+    profiler.count("fetch.records", len(df))
+    return df
+
 
 class DataLoader:
-    def __init__(self):
+    def __init__(self, store: HistoryStore = None, use_store: bool = True, locations: list = None):
         self.username = EPIAS_USERNAME
         self.password = EPIAS_PASSWORD
         self.tgt = None
+        self.tgt_expires_at = 0.0
+        self._tgt_lock = threading.Lock()
+        self.memo = None
         self.headers = {'Content-Type': 'application/json'}
+        self.weather_locations = locations or weather_locations(WEATHER_LOCATIONS)
+        self.session = self._build_session()
+
+        if store is None and use_store and HISTORY_STORE_DIR:
+            store = HistoryStore()
+        self.store = store if use_store else None
+
+    def _build_session(self) -> requests.Session:
+        """Create a keep-alive session that retries 429/5xx responses with backoff."""
+        retry = Retry(
+            total=HTTP_RETRIES,
+            backoff_factor=HTTP_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=EPIAS_MAX_WORKERS,
+                              pool_maxsize=max(EPIAS_MAX_WORKERS, WEATHER_MAX_WORKERS * len(self.weather_locations)))
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @contextmanager
+    def run_scope(self):
+        """Memoize fetched ranges until the block exits, so overlapping calls in one run fetch once."""
+        self.memo = FetchMemo()
+        try:
+            yield self
+        finally:
+            self.memo = None
 
     def _get_tgt(self):
         """Authenticate with EPIAS and obtain a TGT token."""
-        url = "https://giris.epias.com.tr/cas/v1/tickets"
-        response = requests.post(url, data={'username': self.username, 'password': self.password}, timeout=30)
-        
-        if response.status_code == 201:
-            self.tgt = response.headers['Location'].split('/')[-1]
-            self.headers['TGT'] = self.tgt
-        else:
-            raise Exception(f"Failed to get TGT: {response.status_code}, {response.text}")
+        response = self.session.post(TGT_URL, data={'username': self.username, 'password': self.password}, timeout=HTTP_TIMEOUT)
+        self.tgt = tgt_from_response(response)
+        self.tgt_expires_at = time.monotonic() + EPIAS_TGT_TTL
+        self.headers['TGT'] = self.tgt
 
-    def _fetch_monthly(self, url: str, start_date, end_date, label: str) -> pd.DataFrame:
-        """Fetch data from an EPIAS endpoint month by month to avoid timeouts."""
-        if not self.tgt:
+    def _ensure_tgt(self, stale: str = None):
+        """Authenticate once if there is no ticket, it has expired, or ``stale`` was rejected."""
+        with self._tgt_lock:
+            if self.tgt and self.tgt != stale and time.monotonic() < self.tgt_expires_at:
+                return
             self._get_tgt()
 
-        all_data = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            year = current_date.year
-            month = current_date.month
-            last_day = calendar.monthrange(year, month)[1]
-            
-            month_end = pd.Timestamp(year, month, last_day)
-            if month_end > end_date:
-                month_end = end_date
-                
-            start_str = f"{year}-{month:02d}-{current_date.day:02d}T00:00:00+03:00"
-            end_str = f"{year}-{month:02d}-{month_end.day:02d}T23:59:59+03:00"
-
-            logger.info(f"Fetching {label} for {year}-{month:02d}...")
-            
-            try:
-                resp = requests.post(url, headers=self.headers, json={"startDate": start_str, "endDate": end_str})
-                
-                if resp.status_code == 200:
-                    items = resp.json().get('items', [])
-                    all_data.extend(items)
-                    logger.info(f"  OK. ({len(items)} records)")
-                else:
-                    logger.warning(f"  Error: {resp.status_code}")
-            except Exception as e:
-                logger.error(f"  Exception: {e}")
-
-            current_date = month_end + timedelta(days=1)
-
-        df = pd.DataFrame(all_data)
-        if not df.empty:
-            df['date'] = pd.to_datetime(df['date'], utc=True).dt.tz_convert("Europe/Istanbul")
-        return df
+    def _fetch_chunk(self, url: str, start_str: str, end_str: str, label: str) -> list:
+        """POST one month window to EPIAS and return its items."""
+        month = start_str[:7]
+        try:
+            tgt = self.tgt
+            body = chunk_body(start_str, end_str)
+            resp = self.session.post(url, headers=self.headers, json=body, timeout=HTTP_TIMEOUT)
+            if resp.status_code == 401:
+                logger.info("EPIAS ticket rejected, authenticating again")
+                self._ensure_tgt(stale=tgt)
+                resp = self.session.post(url, headers=self.headers, json=body, timeout=HTTP_TIMEOUT)
+            return chunk_items(resp, label, month)
+        except Exception as e:
+            logger.error(f"Exception fetching {label} for {month}: {e}")
+        return []
+
+    def _fetch_monthly(self, url: str, start_date, end_date, label: str) -> pd.DataFrame:
+        """Fetch data from an EPIAS endpoint in concurrent month chunks to avoid timeouts."""
+        self._ensure_tgt()
+
+        chunks = month_chunks(start_date, end_date)
+        logger.info(f"Fetching {label} in {len(chunks)} month chunk(s)...")
+
+        # map() yields results in submission order, so months stay sorted
+        workers = max(1, min(EPIAS_MAX_WORKERS, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda c: self._fetch_chunk(url, c[0], c[1], label), chunks)
+            all_data = [item for items in results for item in items]
+
+        return items_to_frame(all_data)
+
+    def _fetch_with_store(self, source: str, fetch, start_date, end_date) -> pd.DataFrame:
+        """Serve days already fetched in this run from the memo, and the rest through the store."""
+        if self.memo is None:
+            return self._fetch_from_store(source, fetch, start_date, end_date)
 
+        covered, missing_runs = self.memo.plan(source, start_date, end_date)
+        frames = [self.memo.read(source, covered)]
+        for run_start, run_end in missing_runs:
+            fetched = self._fetch_from_store(source, fetch, pd.Timestamp(run_start), pd.Timestamp(run_end))
+            self.memo.add(source, fetched)
+            frames.append(fetched)
+
+        if covered:
+            logger.info(f"{source}: {len(covered)} day(s) reused from this run")
+        return combine_frames(frames)
+
+    def _fetch_from_store(self, source: str, fetch, start_date, end_date) -> pd.DataFrame:
+        """Serve settled days from the local store and fetch only missing or mutable days."""
+        if self.store is None:
+            return fetch(start_date, end_date)
+
+        stored_days, missing_runs = self.store.plan(source, start_date, end_date)
+        fetched = [fetch(pd.Timestamp(run_start), pd.Timestamp(run_end)) for run_start, run_end in missing_runs]
+        return self.store.merge(source, stored_days, fetched)
+
+    @timed("fetch.consumption")
     def get_realtime_consumption(self, start_date, end_date) -> pd.DataFrame:
         """Fetch hourly real-time consumption data from EPIAS."""
-        url = "https://seffaflik.epias.com.tr/electricity-service/v1/consumption/data/realtime-consumption"
-        return self._fetch_monthly(url, start_date, end_date, label="consumption")
+        fetch = lambda s, e: self._fetch_monthly(CONSUMPTION_URL, s, e, label="consumption")
+        return self._fetch_with_store("consumption", fetch, start_date, end_date)
 
+    @timed("fetch.load_estimation_plan")
     def get_load_estimation_plan(self, start_date, end_date) -> pd.DataFrame:
         """Fetch EPIAS load estimation plan (their official forecast)."""
-        url = "https://seffaflik.epias.com.tr/electricity-service/v1/consumption/data/load-estimation-plan"
-        return self._fetch_monthly(url, start_date, end_date, label="load estimation plan")
+        fetch = lambda s, e: self._fetch_monthly(LOAD_PLAN_URL, s, e, label="load estimation plan")
+        return self._fetch_with_store("load_estimation_plan", fetch, start_date, end_date)
 
+    @timed("fetch.weather")
     def get_weather_forecast(self, start_date, end_date) -> pd.DataFrame:
-        """Fetch historical weather forecast data from Open-Meteo."""
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        end_date_str = end_date.strftime("%Y-%m-%d")
-        
-        logger.info(f"Fetching weather data from {start_date_str} to {end_date_str}...")
-
-        url = "https://historical-forecast-api.open-meteo.com/v1/forecast"
-        params = {
-            "latitude": 39.0,
-            "longitude": 35.0,
-            "start_date": start_date_str,
-            "end_date": end_date_str,
-            "hourly": "temperature_2m",
-            "models": "gfs_seamless",
-            "timezone": "Europe/Istanbul"
-        }
+        """Fetch historical weather forecast data from Open-Meteo.
+
+        Every location is served from its own slice of the history store and
+        fetched in parallel; several locations are combined into one weighted
+        ``forecast_temp`` series.
+        """
+        locations = self.weather_locations
+        if len(locations) == 1:
+            frames = [self._location_weather(locations[0], start_date, end_date)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(locations)) as executor:
+                frames = list(executor.map(lambda loc: self._location_weather(loc, start_date, end_date), locations))
+        return combine_locations(frames, locations)
+
+    def _location_weather(self, location: tuple, start_date, end_date) -> pd.DataFrame:
+        fetch = lambda s, e: self._fetch_weather(s, e, location)
+        return self._fetch_with_store(location_source(location), fetch, start_date, end_date)
+
+    def _fetch_weather(self, start_date, end_date, location: tuple = None) -> pd.DataFrame:
+        """Fetch one location in concurrent chunks of WEATHER_CHUNK_DAYS days."""
+        location = location or self.weather_locations[0]
+        chunks = weather_chunks(start_date, end_date)
+        logger.info(f"Fetching {location[0]} weather from {chunks[0][0]:%Y-%m-%d} to {chunks[-1][1]:%Y-%m-%d} in {len(chunks)} chunk(s)...")
+
+        workers = max(1, min(WEATHER_MAX_WORKERS, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(lambda c: self._fetch_weather_chunk(c[0], c[1], location), chunks))
+        return combine_frames(frames)
+
+    def _fetch_weather_chunk(self, start_date, end_date, location: tuple) -> pd.DataFrame:
+        name, lat, lon, _ = location
+        params = weather_params(start_date, end_date, lat, lon)
 
         try:
-            r = requests.get(url, params=params, timeout=30)
-            r.raise_for_status()
-            data = r.json()
-            
-            hourly_data = data.get("hourly", {})
-            
-            forecast_df = pd.DataFrame({
-                "date": hourly_data.get("time", []),
-                "forecast_temp": hourly_data.get("temperature_2m", [])
-            })
-            
-            forecast_df["date"] = pd.to_datetime(forecast_df["date"])
-            
-            if forecast_df["date"].dt.tz is None:
-                 forecast_df["date"] = forecast_df["date"].dt.tz_localize("Europe/Istanbul", ambiguous='NaT', nonexistent='shift_forward')
-            else:
-                 forecast_df["date"] = forecast_df["date"].dt.tz_convert("Europe/Istanbul")
-
-            return forecast_df
+            return weather_response_frame(self.session.get(WEATHER_URL, params=params, timeout=HTTP_TIMEOUT))
         except Exception as e:
-            logger.error(f"Error fetching weather data: {e}")
+            logger.error(f"Error fetching {name} weather for {params['start_date']}..{params['end_date']}: {e}")
             return pd.DataFrame()
 
-
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     loader = DataLoader()
@@ -1,11 +1,18 @@
-from sqlalchemy import create_engine, Column, DateTime, Float
+import pandas as pd
+from sqlalchemy import create_engine, inspect, Column, DateTime, Date, Float, Integer, func, select, cast, and_, delete
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import declarative_base, sessionmaker
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from src.config import DATABASE_URL
+from src.profiling import profiler, timed
 
 Base = declarative_base()
 
+MONITORING_COLUMNS = ['actual_consumption', 'epias_forecast', 'model_prediction']
+BULK_CHUNK_SIZE = 500
+HOURS_PER_DAY = 24
+
 
 class DailyMonitoring(Base):
     __tablename__ = 'daily_monitoring'
@@ -19,13 +26,44 @@ class DailyMonitoring(Base):
         return f"<DailyMonitoring(date={self.date}, actual={self.actual_consumption}, forecast={self.epias_forecast}, prediction={self.model_prediction})>"
 
 
+class DailyMetrics(Base):
+    """Per-day error sums over hours where actual, EPIAS and model values are all present."""
+    __tablename__ = 'daily_metrics'
+
+    day = Column(Date, primary_key=True)
+    n = Column(Integer, nullable=False, default=0)
+    n_pct = Column(Integer, nullable=False, default=0)  # scored hours with a non-zero actual (MAPE denominator)
+    abs_err_model = Column(Float)
+    sq_err_model = Column(Float)
+    pct_err_model = Column(Float)
+    abs_err_epias = Column(Float)
+    sq_err_epias = Column(Float)
+    pct_err_epias = Column(Float)
+
+    def __repr__(self):
+        return f"<DailyMetrics(day={self.day}, n={self.n})>"
+
+
+METRIC_SOURCES = (('model', 'model_prediction'), ('epias', 'epias_forecast'))
+
+
 class Database:
     def __init__(self, db_url: str = None):
         url = db_url or DATABASE_URL
         self.engine = create_engine(url)
+        # A missing rollup table means a database from before daily_metrics existed; one without
+        # n_pct predates the MAPE denominator. The rollup is derived data, so it is dropped and rebuilt.
+        inspector = inspect(self.engine)
+        has_rollup = inspector.has_table(DailyMetrics.__tablename__)
+        if has_rollup and 'n_pct' not in {c['name'] for c in inspector.get_columns(DailyMetrics.__tablename__)}:
+            DailyMetrics.__table__.drop(self.engine)
+            has_rollup = False
         Base.metadata.create_all(self.engine)
         self.Session = sessionmaker(bind=self.engine)
+        if not has_rollup:
+            self.rebuild_daily_metrics()
 
+    @timed("db.upsert")
     def upsert_monitoring_data(self, date_val: datetime, actual=None, forecast=None, prediction=None):
         session = self.Session()
         try:
@@ -41,6 +79,8 @@ class Database:
             if prediction is not None:
                 record.model_prediction = prediction
                 
+            session.flush()
+            self._refresh_daily_metrics(session.connection(), date_val.date(), date_val.date())
             session.commit()
         except Exception as e:
             session.rollback()
@@ -48,6 +88,61 @@ class Database:
         finally:
             session.close()
 
+    @staticmethod
+    def _monitoring_records(df: pd.DataFrame) -> list:
+        """Turn a frame with date + monitoring columns into rows with naive local datetimes and None for NaN."""
+        dates = pd.to_datetime(df['date'])
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_convert("Europe/Istanbul").dt.tz_localize(None)
+
+        records = []
+        columns = {col: df[col].astype(object).where(df[col].notna(), None).tolist() for col in MONITORING_COLUMNS if col in df.columns}
+        for i, ts in enumerate(pd.DatetimeIndex(dates).to_pydatetime()):
+            record = {'date': ts}
+            record.update({col: values[i] for col, values in columns.items()})
+            records.append(record)
+        return records
+
+    @timed("db.bulk_upsert")
+    def bulk_upsert_monitoring(self, df: pd.DataFrame) -> int:
+        """Upsert a whole frame in one transaction, never overwriting stored values with NULL."""
+        if df.empty:
+            return 0
+
+        records = self._monitoring_records(df.drop_duplicates(subset=['date'], keep='last'))
+        profiler.count("db.rows_written", len(records))
+        value_columns = [col for col in MONITORING_COLUMNS if col in df.columns]
+        dialect = self.engine.dialect.name
+        first_day = min(r['date'] for r in records).date()
+        last_day = max(r['date'] for r in records).date()
+
+        if dialect not in ('postgresql', 'sqlite'):
+            with self.Session.begin() as session:
+                for record in records:
+                    row = session.get(DailyMonitoring, record['date']) or DailyMonitoring(date=record['date'])
+                    for col in value_columns:
+                        if record[col] is not None:
+                            setattr(row, col, record[col])
+                    session.add(row)
+                session.flush()
+                self._refresh_daily_metrics(session.connection(), first_day, last_day)
+            return len(records)
+
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        table = DailyMonitoring.__table__
+
+        with self.engine.begin() as conn:
+            for i in range(0, len(records), BULK_CHUNK_SIZE):
+                stmt = insert(table).values(records[i:i + BULK_CHUNK_SIZE])
+                update = {col: func.coalesce(stmt.excluded[col], table.c[col]) for col in value_columns}
+                if update:
+                    stmt = stmt.on_conflict_do_update(index_elements=[table.c.date], set_=update)
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.date])
+                conn.execute(stmt)
+            self._refresh_daily_metrics(conn, first_day, last_day)
+        return len(records)
+
     def get_monitoring_data(self):
         session = self.Session()
         try:
@@ -56,6 +151,138 @@ class Database:
         finally:
             session.close()
 
+    def _date_filter(self, start=None, end=None) -> list:
+        """WHERE clauses for an inclusive [start, end] day range."""
+        table = DailyMonitoring.__table__
+        clauses = []
+        if start is not None:
+            clauses.append(table.c.date >= pd.Timestamp(start).normalize().to_pydatetime())
+        if end is not None:
+            clauses.append(table.c.date < (pd.Timestamp(end).normalize() + timedelta(days=1)).to_pydatetime())
+        return clauses
+
+    def _day_expr(self):
+        table = DailyMonitoring.__table__
+        if self.engine.dialect.name == 'sqlite':
+            return func.date(table.c.date)
+        return cast(table.c.date, Date)
+
+    def get_monitoring_frame(self, start=None, end=None, columns: list = None, since=None) -> pd.DataFrame:
+        """Hourly rows for an inclusive day range as a DataFrame, read straight from the cursor.
+
+        ``since`` additionally limits the rows to timestamps at or after it, for incremental reads.
+        """
+        table = DailyMonitoring.__table__
+        columns = columns or MONITORING_COLUMNS
+        stmt = select(table.c.date, *[table.c[col] for col in columns]).order_by(table.c.date)
+        clauses = self._date_filter(start, end)
+        if since is not None:
+            clauses.append(table.c.date >= pd.Timestamp(since).to_pydatetime())
+        if clauses:
+            stmt = stmt.where(and_(*clauses))
+
+        with self.engine.connect() as conn:
+            result = conn.execute(stmt)
+            df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+        df['date'] = pd.to_datetime(df['date'])
+        df[columns] = df[columns].astype(float)
+        return df
+
+    def get_monitoring_date_bounds(self):
+        """First and last stored timestamps, or (None, None) when the table is empty."""
+        table = DailyMonitoring.__table__
+        with self.engine.connect() as conn:
+            first, last = conn.execute(select(func.min(table.c.date), func.max(table.c.date))).one()
+        if first is None:
+            return None, None
+        return pd.Timestamp(first), pd.Timestamp(last)
+
+    def get_missing_hours(self, start, end) -> pd.DataFrame:
+        """Hours per day in [start, end] (rows) that lack each monitoring column (columns); 24 when no row exists."""
+        table = DailyMonitoring.__table__
+        day = self._day_expr().label('day')
+        counts = [func.count(table.c[col]).label(col) for col in MONITORING_COLUMNS]
+        stmt = select(day, *counts).where(and_(*self._date_filter(start, end))).group_by(day)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).mappings().all()
+        filled = pd.DataFrame([{**row, 'day': pd.Timestamp(row['day']).date()} for row in rows],
+                              columns=['day', *MONITORING_COLUMNS]).set_index('day')
+
+        days = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq='D').date
+        filled = filled.reindex(days, fill_value=0).astype(int)
+        return HOURS_PER_DAY - filled.clip(upper=HOURS_PER_DAY)
+
+    def _refresh_daily_metrics(self, conn, first_day, last_day):
+        """Recompute the daily_metrics rows for [first_day, last_day] from the hourly table."""
+        table = DailyMonitoring.__table__
+        metrics = DailyMetrics.__table__
+        actual = table.c.actual_consumption
+
+        day = self._day_expr().label('day')
+        aggregates = [func.count().label('n'), func.count(func.nullif(actual, 0)).label('n_pct')]
+        for name, column in METRIC_SOURCES:
+            error = actual - table.c[column]
+            aggregates += [
+                func.sum(func.abs(error)).label(f'abs_err_{name}'),
+                func.sum(error * error).label(f'sq_err_{name}'),
+                # NULL instead of a division error on zero actuals (Postgres raises, aborting the upsert)
+                func.sum(func.abs(error) / func.nullif(actual, 0)).label(f'pct_err_{name}'),
+            ]
+
+        clauses = self._date_filter(first_day, last_day)
+        clauses += [actual.isnot(None)] + [table.c[column].isnot(None) for _, column in METRIC_SOURCES]
+        rows = conn.execute(select(day, *aggregates).where(and_(*clauses)).group_by(day)).mappings().all()
+
+        conn.execute(delete(metrics).where(and_(metrics.c.day >= first_day, metrics.c.day <= last_day)))
+        if rows:
+            conn.execute(metrics.insert(), [{**row, 'day': pd.Timestamp(row['day']).date()} for row in rows])
+
+    def rebuild_daily_metrics(self):
+        """Recompute the whole daily_metrics rollup from daily_monitoring."""
+        first, last = self.get_monitoring_date_bounds()
+        if first is None:
+            return
+        with self.engine.begin() as conn:
+            self._refresh_daily_metrics(conn, first.date(), last.date())
+
+    def get_error_metrics(self, start=None, end=None, by_day: bool = False) -> pd.DataFrame:
+        """MAE, MAPE and RMSE of the model and EPIAS forecasts from the daily_metrics rollup.
+
+        Only hours with actual, EPIAS and model values all present are scored,
+        matching the dashboard's ``dropna`` semantics. With ``by_day`` there is
+        one row per day, otherwise a single row for the whole range.
+        """
+        metrics = DailyMetrics.__table__
+        sums = [c for c in metrics.c if c.name != 'day']
+
+        clauses = []
+        if start is not None:
+            clauses.append(metrics.c.day >= pd.Timestamp(start).date())
+        if end is not None:
+            clauses.append(metrics.c.day <= pd.Timestamp(end).date())
+
+        if by_day:
+            stmt = select(metrics.c.day, *sums).order_by(metrics.c.day)
+        else:
+            stmt = select(*[func.coalesce(func.sum(c), 0).label(c.name) for c in sums])
+        if clauses:
+            stmt = stmt.where(and_(*clauses))
+
+        with self.engine.connect() as conn:
+            result = conn.execute(stmt)
+            df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+        n = df['n'].astype(float).where(df['n'] > 0)
+        # Zero-actual hours have no percentage error, so MAPE averages over the others only
+        n_pct = df['n_pct'].astype(float).where(df['n_pct'] > 0)
+        out = df[['day']].copy() if by_day else pd.DataFrame(index=df.index)
+        out['n'] = df['n'].astype(int)
+        for name, _ in METRIC_SOURCES:
+            out[f'mae_{name}'] = df[f'abs_err_{name}'].astype(float) / n
+            out[f'mape_{name}'] = df[f'pct_err_{name}'].astype(float) / n_pct * 100
+            out[f'rmse_{name}'] = (df[f'sq_err_{name}'].astype(float) / n) ** 0.5
+        return out
 
 if __name__ == "__main__":
     db = Database()
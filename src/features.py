@@ -1,112 +1,174 @@
+import numpy as np
 import pandas as pd
-import holidays
-
-RAMADAN_DATES = [
-    ("2022-04-02", "2022-05-01"),
-    ("2023-03-23", "2023-04-20"),
-    ("2024-03-11", "2024-04-09"),
-    ("2025-03-01", "2025-03-29"),
-    ("2026-02-18", "2026-03-19"),
-    ("2027-02-08", "2027-03-08"),
-]
-
-KURBAN_DATES = [
-    ("2022-07-09", "2022-07-12"),
-    ("2023-06-28", "2023-07-01"),
-    ("2024-06-17", "2024-06-20"),
-    ("2025-06-06", "2025-06-09"),
-    ("2026-05-26", "2026-05-29"),
-    ("2027-05-16", "2027-05-19"),
-]
-
-ramadan_set = set()
-for start, end in RAMADAN_DATES:
-    for d in pd.date_range(start, end):
-        ramadan_set.add(d.date())
-
-kurban_set = set()
-for start, end in KURBAN_DATES:
-    for d in pd.date_range(start, end):
-        kurban_set.add(d.date())
+
+from src.calendar_features import calendar_columns, RAMADAN_DATES, KURBAN_DATES
+from src.profiling import timed
+
+TIMEZONE = "Europe/Istanbul"
+
+# Bump when feature logic changes so cached feature frames are rebuilt
+FEATURE_VERSION = 2
+
+# Smallest dtypes that hold each model feature; everything else becomes float32
+COMPACT_DTYPES = {
+    'hour': 'int8', 'dayofweek': 'int8', 'dayofyear': 'int16', 'month': 'int8',
+    'quarter': 'int8', 'year': 'int16',
+    'is_holiday': 'int8', 'is_ramadan': 'int8', 'is_kurban': 'int8',
+    'is_bridge': 'int8', 'days_to_holiday': 'int8', 'days_after_holiday': 'int8',
+}
+
+
+def compact_frame(df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+    """Return ``columns`` of ``df`` downcast to compact dtypes (int8/int16/float32)."""
+    columns = columns or list(df.columns)
+    return pd.DataFrame(
+        {col: df[col].to_numpy(dtype=COMPACT_DTYPES.get(col, 'float32')) for col in columns},
+        index=df.index,
+    )
+
+
+def _compact_columns(columns: dict) -> dict:
+    """Downcast builder output; integer features with missing hours (NaT) stay float32."""
+    out = {}
+    for col, values in columns.items():
+        values = np.asarray(values)
+        dtype = COMPACT_DTYPES.get(col, 'float32')
+        if values.dtype.kind == 'f' and dtype.startswith('int') and np.isnan(values).any():
+            dtype = 'float32'
+        out[col] = values.astype(dtype, copy=False)
+    return out
+
+
+def _local_index(index) -> pd.DatetimeIndex:
+    """Return a DatetimeIndex in Istanbul time without going through strings."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        return index.tz_localize(TIMEZONE, ambiguous='NaT', nonexistent='shift_forward')
+    return index.tz_convert(TIMEZONE)
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if periods < len(values):
+        out[periods:] = values[:len(values) - periods]
+    return out
 
 
 class FeatureEngineer:
     def __init__(self):
         pass
 
-    def add_temporal_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
+    # Column builders. Each returns a dict of new columns aligned to the given index
+    # so process_data can assemble the frame in one step.
+
+    @timed("features.temporal")
+    def _temporal_columns(self, index: pd.DatetimeIndex) -> dict:
+        return {
+            'hour': index.hour,
+            'dayofyear': index.dayofyear,
+            'dayofweek': index.dayofweek,
+            'month': index.month,
+            'quarter': index.quarter,
+            'year': index.year,
+        }
+
+    @timed("features.calendar")
+    def _calendar_columns(self, index: pd.DatetimeIndex) -> dict:
+        return calendar_columns(index)
+
+    @timed("features.lags")
+    def _lag_columns(self, consumption) -> dict:
+        values = pd.to_numeric(pd.Series(consumption), errors='coerce').to_numpy(dtype=np.float64)
+        lag_48 = _shift(values, 48)
+        lag_series = pd.Series(lag_48)
+        roll_1d = lag_series.rolling(window=24)
+        roll_1w = lag_series.rolling(window=168)
+        return {
+            'lag_48': lag_48,
+            'lag_72': _shift(values, 72),
+            'lag_168': _shift(values, 168),
+            'roll_mean_1d': roll_1d.mean().to_numpy(),
+            'roll_std_1d': roll_1d.std().to_numpy(),
+            'roll_mean_1w': roll_1w.mean().to_numpy(),
+            'roll_std_1w': roll_1w.std().to_numpy(),
+        }
+
+    @timed("features.weather")
+    def _weather_columns(self, index: pd.DatetimeIndex, forecast_df: pd.DataFrame) -> dict:
+        if forecast_df is None or forecast_df.empty or 'date' not in forecast_df.columns:
+            return {}
+        forecast = forecast_df.dropna(subset=['date'])
+        forecast = forecast.set_index(_local_index(forecast['date'])).drop(columns='date')
+        forecast = forecast[~forecast.index.duplicated(keep='first')]
+        aligned = forecast.reindex(index)
+        return {col: aligned[col].to_numpy() for col in aligned.columns}
+
+    @staticmethod
+    def _indexed(df: pd.DataFrame) -> pd.DataFrame:
         if 'date' in df.columns:
             df = df.set_index('date')
-
-        df['hour'] = df.index.hour
-        df['dayofyear'] = df.index.dayofyear
-        df['dayofweek'] = df.index.dayofweek
-        df['month'] = df.index.month
-        df['quarter'] = df.index.quarter
-        df['year'] = df.index.year
+        df.index = _local_index(df.index).rename('date')
         return df
 
+    # Step-wise API, kept for callers that need a single feature group.
+
+    def add_temporal_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = self._indexed(df.copy())
+        return df.assign(**self._temporal_columns(df.index))
+
     def add_holiday_feature(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        unique_dates = pd.to_datetime(df.index.date).unique()
-        
-        years = df.index.year.unique()
-        tr_holidays = holidays.Turkey(years=years)
-        holiday_dates = set(tr_holidays.keys())
-        
-        df['is_holiday'] = df.index.map(lambda x: x.date() in holiday_dates).astype(int)
-        return df
+        cols = self._calendar_columns(df.index)
+        return df.assign(is_holiday=cols['is_holiday'])
 
     def add_islamic_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        dates = df.index.date
-        df['is_ramadan'] = [1 if d in ramadan_set else 0 for d in dates]
-        df['is_kurban'] = [1 if d in kurban_set else 0 for d in dates]
-        return df
+        cols = self._calendar_columns(df.index)
+        return df.assign(is_ramadan=cols['is_ramadan'], is_kurban=cols['is_kurban'])
 
     def add_lag_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df['lag_48'] = df['consumption'].shift(48)
-        df['lag_72'] = df['consumption'].shift(72)
-        df['lag_168'] = df['consumption'].shift(168)
-        return df
+        cols = self._lag_columns(df['consumption'])
+        return df.assign(lag_48=cols['lag_48'], lag_72=cols['lag_72'], lag_168=cols['lag_168'])
 
     def add_rolling_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        df['roll_mean_1d'] = df['lag_48'].rolling(window=24).mean()
-        df['roll_std_1d'] = df['lag_48'].rolling(window=24).std()
-        df['roll_mean_1w'] = df['lag_48'].rolling(window=168).mean()
-        df['roll_std_1w'] = df['lag_48'].rolling(window=168).std()
-        return df
+        lag_series = pd.Series(df['lag_48'].to_numpy(dtype=np.float64), index=df.index)
+        return df.assign(
+            roll_mean_1d=lag_series.rolling(window=24).mean(),
+            roll_std_1d=lag_series.rolling(window=24).std(),
+            roll_mean_1w=lag_series.rolling(window=168).mean(),
+            roll_std_1w=lag_series.rolling(window=168).std(),
+        )
 
     def add_weather_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
         if 'forecast_temp' in df.columns:
-            df['temp_squared'] = df['forecast_temp'] ** 2
+            return df.assign(temp_squared=df['forecast_temp'] ** 2)
         return df
 
     def merge_weather(self, df: pd.DataFrame, forecast_df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        if df.index.name == 'date':
-            df = df.reset_index()
-        df['date'] = pd.to_datetime(df['date'].astype(str).str[:19])
-
-        forecast_df = forecast_df.copy()
-        forecast_df['date'] = pd.to_datetime(forecast_df['date'].astype(str).str[:19])
-
-        merged_df = pd.merge(df, forecast_df, on='date', how='left')
-        merged_df = merged_df.set_index('date')
-        return merged_df
-
-    def process_data(self, df: pd.DataFrame, forecast_df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        
-        df = self.add_temporal_features(df)
-        df = self.add_holiday_feature(df)
-        df = self.add_islamic_features(df)
-        df = self.add_lag_features(df)
-        df = self.add_rolling_features(df)
-        df = self.merge_weather(df, forecast_df)
-        df = self.add_weather_features(df)
-        return df
+        df = self._indexed(df.copy())
+        return df.assign(**self._weather_columns(df.index, forecast_df))
+
+    @timed("features.process_data")
+    def process_data(self, df: pd.DataFrame, forecast_df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+        """Build all model features in a single pass over a tz-aware hourly index.
+
+        With ``compact`` every column is downcast (COMPACT_DTYPES, else float32)
+        as soon as its group is built, so no float64 feature frame is held.
+        XGBoost reads features as float32, so a model sees the same values.
+        """
+        base = df.set_index('date') if 'date' in df.columns else df
+        index = _local_index(base.index).rename('date')
+        add = _compact_columns if compact else dict
+
+        columns = {}
+        columns.update(add(self._temporal_columns(index)))
+        columns.update(add(self._calendar_columns(index)))
+        columns.update(add(self._lag_columns(base['consumption'].to_numpy())))
+        weather = self._weather_columns(index, forecast_df)
+        if 'forecast_temp' in weather:
+            weather['temp_squared'] = weather['forecast_temp'] ** 2
+        columns.update(add(weather))
+
+        features = pd.DataFrame(columns, index=index)
+        base = base.drop(columns=[c for c in features.columns if c in base.columns]).set_axis(index, axis=0)
+        if compact:
+            base = base.astype({col: 'float32' for col in base.columns if base[col].dtype == np.float64})
+        return pd.concat([base, features], axis=1)
@@ -1,70 +1,252 @@
+import asyncio
 import logging
 import os
+import threading
 import pandas as pd
-import xgboost as xgb
 from datetime import datetime, timedelta
 
 from src.data_loader import DataLoader
 from src.features import FeatureEngineer
-from src.config import FEATURE_COLUMNS, MODEL_PATH
+from src.profiling import profiler, timed
+from src.store import to_day
+from src.model_backend import load_model, make_backend, model_fingerprint, resolve_model_artifact
+from src.registry import ModelRegistry, ModelValidationError, validate_model
+from src.config import FEATURE_COLUMNS, MODEL_PATH, MODEL_REGISTRY_DIR
 
 logger = logging.getLogger(__name__)
 
 
+class LoadedModel:
+    """A validated model with its backend and identity, swapped in as one object.
+
+    Requests take a reference to the current LoadedModel when they start, so a
+    swap never mixes two versions within one request.
+    """
+
+    def __init__(self, model_path: str, version: str = None, meta: dict = None):
+        artifact = resolve_model_artifact(model_path)
+        self.model = load_model(model_path)
+        validate_model(self.model, meta)
+        self.backend = make_backend(self.model)
+        self.path = model_path
+        self.version = version
+        self.fingerprint = model_fingerprint(artifact)
+        self.source_key = _source_key(model_path, version)
+
+        # A one-row dry run, so a model the backend cannot evaluate is rejected before it serves traffic
+        self.backend.predict(pd.DataFrame([[0.0] * len(FEATURE_COLUMNS)], columns=FEATURE_COLUMNS))
+
+
+def _source_key(model_path: str, version: str = None):
+    """Identifies what is on disk: the registry version, or the artifact's path, mtime and size."""
+    if version:
+        return version
+    artifact = resolve_model_artifact(model_path)
+    if not os.path.exists(artifact):
+        return None
+    st = os.stat(artifact)
+    return artifact, st.st_mtime_ns, st.st_size
+
+
 class InferencePipeline:
-    def __init__(self, model_path: str = None):
-        self.data_loader = DataLoader()
+    def __init__(self, model_path: str = None, data_loader: DataLoader = None, registry: ModelRegistry = None):
+        self.data_loader = data_loader or DataLoader()
         self.feature_engineer = FeatureEngineer()
-        self.model = None
+        self.loaded = None
+        self._reload_lock = threading.Lock()
+        self._rejected_key = None
+
+        # An explicit model path is served as is; otherwise the registry's active version, falling back to MODEL_PATH
+        self.registry = None if model_path else registry or (ModelRegistry() if MODEL_REGISTRY_DIR else None)
+        self.model_path = model_path or MODEL_PATH
+
+        if not self.reload() and self._rejected_key is None:
+            logger.error(f"Model file not found: {self.model_path}")
+
+    @property
+    def model(self):
+        return self.loaded.model if self.loaded else None
+
+    @property
+    def backend(self):
+        return self.loaded.backend if self.loaded else None
+
+    @property
+    def model_fingerprint(self):
+        return self.loaded.fingerprint if self.loaded else None
+
+    @property
+    def model_version(self):
+        return self.loaded.version if self.loaded else None
+
+    def _active_source(self):
+        """(model path, registry version or None) that should be served right now."""
+        if self.registry is None:
+            return self.model_path, None
+        return self.registry.active_source(self.model_path)
+
+    def _load(self, model_path: str, version: str = None) -> LoadedModel:
+        meta = self.registry.meta(version) if version else None
+        return LoadedModel(model_path, version, meta)
+
+    def swap(self, loaded: LoadedModel):
+        """Serve ``loaded`` from now on; requests already running finish on the previous model."""
+        previous = self.loaded
+        self.loaded = loaded
+        logger.info(f"Serving model {loaded.version or loaded.path} ({loaded.fingerprint}), "
+                    f"was {(previous.version or previous.fingerprint) if previous else 'none'}")
+
+    def reload(self) -> bool:
+        """Load and swap in the active model if it changed on disk. Returns whether a new model was swapped in.
+
+        A model that fails to load or validate is logged once and the current one keeps serving.
+        """
+        with self._reload_lock:
+            model_path, version = self._active_source()
+            key = _source_key(model_path, version)
+            if key is None or key == self._rejected_key:
+                return False
+            if self.loaded is not None and key == self.loaded.source_key:
+                return False
+
+            try:
+                loaded = self._load(model_path, version)
+            except Exception as e:
+                self._rejected_key = key
+                logger.error(f"Rejected model {version or model_path}: {e}")
+                return False
+
+            self._rejected_key = None
+            self.swap(loaded)
+            return True
+
+    def pin(self, version: str) -> LoadedModel:
+        """Validate ``version``, pin it in the registry and serve it.
+
+        Raises KeyError for unknown versions and ModelValidationError when the artifact cannot be loaded or validated.
+        """
+        if self.registry is None:
+            raise ModelValidationError("The model registry is disabled.")
+        with self._reload_lock:
+            try:
+                loaded = self._load(self.registry.model_path(version), version)
+            except (KeyError, ModelValidationError):
+                raise
+            except Exception as e:
+                # A corrupt or unreadable artifact is as unusable as a mismatched one
+                raise ModelValidationError(f"Version {version} could not be loaded: {str(e).splitlines()[0]}") from e
+            self.registry.pin(version)
+            self.swap(loaded)
+            return loaded
 
-        model_path = model_path or MODEL_PATH
+    def rollback(self) -> LoadedModel:
+        """Pin and serve the version published before the one currently served."""
+        if self.registry is None or not self.model_version:
+            raise ModelValidationError("No registry version is being served.")
+        previous = self.registry.previous_version(self.model_version)
+        if previous is None:
+            raise ModelValidationError(f"{self.model_version} is the oldest version.")
+        return self.pin(previous)
 
-        if os.path.exists(model_path):
-            self.model = xgb.XGBRegressor()
-            self.model.load_model(model_path)
-            logger.info(f"Model loaded from {model_path}")
-        else:
-            logger.error(f"Model file not found: {model_path}")
+    def unpin(self) -> bool:
+        """Drop the pin and serve the newest version."""
+        if self.registry is not None:
+            self.registry.unpin()
+        return self.reload()
 
     def predict(self, target_date: datetime) -> pd.DataFrame:
-        if self.model is None:
+        return self.predict_range(target_date, target_date)
+
+    def _window(self, start_date, end_date):
+        """Target days plus the start of the history window needed for lag features."""
+        start_day = pd.Timestamp(to_day(start_date))
+        end_day = pd.Timestamp(to_day(end_date))
+        if end_day < start_day:
+            raise ValueError("end_date must not be before start_date.")
+        return start_day, end_day, start_day - timedelta(days=10)
+
+    @timed("predict.range")
+    def predict_range(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """Predict every hour from start_date to end_date (inclusive days) with one fetch and one model call."""
+        model = self.loaded
+        if model is None:
             raise RuntimeError("No model loaded. Cannot make predictions.")
 
-        history_start_date = target_date - timedelta(days=10)
+        start_day, end_day, history_start_date = self._window(start_date, end_date)
 
         consumption_df = self.data_loader.get_realtime_consumption(
             start_date=history_start_date,
-            end_date=target_date
+            end_date=end_day
+        )
+
+        forecast_df = self.data_loader.get_weather_forecast(
+            start_date=history_start_date,
+            end_date=end_day
         )
 
+        return self.predict_from_data(consumption_df, forecast_df, start_day, end_day, model)
+
+    async def apredict_range(self, loader, start_date: datetime, end_date: datetime, executor=None,
+                             model: LoadedModel = None) -> pd.DataFrame:
+        """Async variant: fetch with an AsyncDataLoader, then run the CPU-bound part on ``executor``.
+
+        If cancelled during the CPU-bound part, the task ends only after the executor work has finished.
+        """
+        model = model or self.loaded
+        if model is None:
+            raise RuntimeError("No model loaded. Cannot make predictions.")
+
+        start_day, end_day, history_start_date = self._window(start_date, end_date)
+
+        consumption_df, forecast_df = await asyncio.gather(
+            loader.get_realtime_consumption(start_date=history_start_date, end_date=end_day),
+            loader.get_weather_forecast(start_date=history_start_date, end_date=end_day),
+        )
+
+        loop = asyncio.get_running_loop()
+        work = loop.run_in_executor(
+            executor, self.predict_from_data, consumption_df, forecast_df, start_day, end_day, model
+        )
+        try:
+            return await asyncio.shield(work)
+        except asyncio.CancelledError:
+            # The worker thread cannot be interrupted; finish cancelling only once the pool slot is free again
+            await asyncio.wait({work})
+            raise
+
+    def predict_from_data(self, consumption_df: pd.DataFrame, forecast_df: pd.DataFrame, start_date, end_date,
+                          model: LoadedModel = None) -> pd.DataFrame:
+        """Build features from already fetched frames and predict the target days with ``model`` (default: current)."""
+        model = model or self.loaded
         if consumption_df.empty:
             raise ValueError("No historical consumption data found.")
 
+        start_day = pd.Timestamp(to_day(start_date))
+        end_day = pd.Timestamp(to_day(end_date))
+
         target_hours = pd.date_range(
-            start=target_date.replace(hour=0, minute=0, second=0, microsecond=0),
-            end=target_date.replace(hour=23, minute=0, second=0, microsecond=0),
-            freq='H',
+            start=start_day,
+            end=end_day + timedelta(hours=23),
+            freq='h',
             tz='Europe/Istanbul'
         )
 
         target_df = pd.DataFrame({'date': target_hours})
-        target_df['consumption'] = None
+        target_df['consumption'] = float('nan')
 
         full_df = pd.concat([consumption_df, target_df], ignore_index=True)
         full_df = full_df.drop_duplicates(subset=['date'], keep='first')
         full_df = full_df.set_index('date').sort_index()
 
-        forecast_df = self.data_loader.get_weather_forecast(
-            start_date=history_start_date,
-            end_date=target_date
-        )
-
         df_processed = self.feature_engineer.process_data(full_df, forecast_df)
 
-        target_rows = df_processed.loc[df_processed.index.date == target_date.date()]
+        days = df_processed.index.date
+        target_rows = df_processed.loc[(days >= start_day.date()) & (days <= end_day.date())]
         X_target = target_rows[FEATURE_COLUMNS]
 
-        predictions = self.model.predict(X_target)
+        with profiler.timer("predict.model"):
+            predictions = model.backend.predict(X_target)
+        profiler.count("predict.rows", len(X_target))
 
         results = pd.DataFrame({
             'date': target_rows.index,
@@ -73,7 +255,6 @@ class InferencePipeline:
 
         return results
 
-
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     pipeline = InferencePipeline()
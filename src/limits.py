@@ -0,0 +1,52 @@
+import asyncio
+
+
+class Overloaded(Exception):
+    """Raised when a request is rejected because the server is at capacity."""
+
+
+class ConcurrencyLimiter:
+    """Bounds how many requests run at once and how many may wait for a slot.
+
+    Requests beyond ``max_concurrent + max_queue`` are rejected immediately so
+    a slow upstream cannot pile up unbounded work; queued requests give up
+    after ``queue_timeout`` seconds.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self):
+        """Wait for a slot; pair with ``release``. Raises Overloaded when full or after ``queue_timeout``."""
+        if self.waiting >= self.max_queue and self.active >= self.max_concurrent:
+            self.rejected += 1
+            raise Overloaded("Too many requests in flight.")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Overloaded("Timed out waiting for a free worker.")
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self._slots.release()
+
+    def info(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+        }
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+
+def mae(actual, predicted) -> float:
+    actual, predicted = np.asarray(actual, dtype=np.float64), np.asarray(predicted, dtype=np.float64)
+    return float(np.mean(np.abs(actual - predicted)))
+
+
+def mape(actual, predicted) -> float:
+    """Mean absolute percentage error, in percent."""
+    actual, predicted = np.asarray(actual, dtype=np.float64), np.asarray(predicted, dtype=np.float64)
+    return float(np.mean(np.abs(actual - predicted) / actual) * 100)
+
+
+def rmse(actual, predicted) -> float:
+    actual, predicted = np.asarray(actual, dtype=np.float64), np.asarray(predicted, dtype=np.float64)
+    return float(np.sqrt(np.mean((actual - predicted) ** 2)))
+
+
+def error_summary(df: pd.DataFrame, by=None, actual: str = 'actual', forecasts: dict = None) -> pd.DataFrame:
+    """MAE, MAPE and RMSE for each forecast column, optionally grouped by column(s) ``by``.
+
+    ``forecasts`` maps a short name to a column, e.g. ``{'model': 'prediction'}``;
+    the output has ``n`` plus ``mae_<name>``, ``mape_<name>`` and ``rmse_<name>``.
+    Rows missing the actual or any forecast are ignored.
+    """
+    forecasts = forecasts or {'model': 'prediction'}
+    valid = df.dropna(subset=[actual, *forecasts.values()])
+
+    errors = pd.DataFrame(index=valid.index)
+    for name, col in forecasts.items():
+        diff = valid[actual] - valid[col]
+        errors[f'mae_{name}'] = diff.abs()
+        errors[f'mape_{name}'] = diff.abs() / valid[actual] * 100
+        errors[f'rmse_{name}'] = diff ** 2
+
+    if by is None:
+        summary = errors.mean().to_frame().T
+        summary.insert(0, 'n', len(errors))
+    else:
+        keys = [valid[col] for col in ([by] if isinstance(by, str) else by)]
+        grouped = errors.groupby(keys)
+        summary = grouped.mean()
+        summary.insert(0, 'n', grouped.size())
+
+    rmse_cols = [c for c in summary.columns if c.startswith('rmse_')]
+    summary[rmse_cols] = np.sqrt(summary[rmse_cols])
+    return summary
@@ -0,0 +1,168 @@
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.config import FEATURE_COLUMNS, INFERENCE_BACKEND
+
+logger = logging.getLogger(__name__)
+
+
+def binary_artifact_path(model_path: str) -> str:
+    """Path of the UBJSON artifact exported next to a JSON model."""
+    return os.path.splitext(model_path)[0] + ".ubj"
+
+
+def resolve_model_artifact(model_path: str) -> str:
+    """Prefer the binary UBJSON export when it exists and is not older than the JSON model."""
+    if not model_path.endswith(".json"):
+        return model_path
+    ubj_path = binary_artifact_path(model_path)
+    if os.path.exists(ubj_path) and (
+        not os.path.exists(model_path) or os.path.getmtime(ubj_path) >= os.path.getmtime(model_path)
+    ):
+        return ubj_path
+    return model_path
+
+
+def model_fingerprint(model_path: str) -> str:
+    """Short content hash identifying a model artifact."""
+    digest = hashlib.sha1()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def export_binary(model, model_path: str) -> str:
+    """Write the UBJSON copy of ``model`` next to ``model_path``."""
+    ubj_path = binary_artifact_path(model_path)
+    model.save_model(ubj_path)
+    return ubj_path
+
+
+class SklearnBackend:
+    """The default path: XGBRegressor.predict on a DataFrame."""
+
+    def __init__(self, model: xgb.XGBRegressor):
+        self.model = model
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        return self.model.predict(X)
+
+
+class InplaceBackend:
+    """Booster.inplace_predict on a float32 matrix, skipping the DMatrix round-trip."""
+
+    def __init__(self, model: xgb.XGBRegressor):
+        self.booster = model.get_booster()
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        values = np.ascontiguousarray(X[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+        return self.booster.inplace_predict(values)
+
+
+class TreeArrayBackend:
+    """Pure NumPy evaluation of the boosted trees.
+
+    The trees are flattened into padded ``(n_trees, max_nodes)`` arrays and all
+    trees are walked together, one depth level per step, for every row.
+    Only numerical splits and single-target regression models are supported.
+    """
+
+    def __init__(self, model: xgb.XGBRegressor):
+        raw = json.loads(model.get_booster().save_raw("json"))
+        learner = raw["learner"]
+        trees = learner["gradient_booster"]["model"]["trees"]
+
+        if any(any(t["split_type"]) for t in trees):
+            raise ValueError("TreeArrayBackend does not support categorical splits.")
+
+        # Stored as "3.8E4" by older XGBoost versions and "[3.8E4]" by newer ones
+        self.base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+
+        n_trees = len(trees)
+        max_nodes = max(len(t["left_children"]) for t in trees)
+        self.left = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+        self.right = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+        self.feature = np.zeros((n_trees, max_nodes), dtype=np.int32)
+        self.threshold = np.zeros((n_trees, max_nodes), dtype=np.float32)
+        self.default_left = np.zeros((n_trees, max_nodes), dtype=bool)
+
+        for i, t in enumerate(trees):
+            n = len(t["left_children"])
+            self.left[i, :n] = t["left_children"]
+            self.right[i, :n] = t["right_children"]
+            self.feature[i, :n] = t["split_indices"]
+            self.threshold[i, :n] = t["split_conditions"]  # leaf value on leaf nodes
+            self.default_left[i, :n] = np.asarray(t["default_left"], dtype=bool)
+
+        # Flatten to 1-D with global node ids so each level is a single gather
+        offsets = (np.arange(n_trees, dtype=np.int32) * max_nodes)[:, None]
+        is_leaf = self.left == -1
+        self.left = np.where(is_leaf, np.arange(max_nodes, dtype=np.int32), self.left) + offsets
+        self.right = np.where(is_leaf, np.arange(max_nodes, dtype=np.int32), self.right) + offsets
+        self.left, self.right = self.left.ravel(), self.right.ravel()
+        self.feature, self.threshold = self.feature.ravel(), self.threshold.ravel()
+        self.default_left = self.default_left.ravel()
+        self.roots = offsets.ravel()
+        self.depth = max(self._depth(t) for t in trees)
+
+    @staticmethod
+    def _depth(tree) -> int:
+        left, right = tree["left_children"], tree["right_children"]
+        depth, frontier = 0, [0]
+        while True:
+            frontier = [c for n in frontier for c in (left[n], right[n]) if c != -1]
+            if not frontier:
+                return depth
+            depth += 1
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        values = X[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+        rows = np.arange(len(values))[:, None]
+        node = np.broadcast_to(self.roots, (len(values), len(self.roots)))
+
+        # Leaves point to themselves, so walking max-depth levels lands every row on its leaf
+        for _ in range(self.depth):
+            x = values[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        leaf_values = self.threshold[node].astype(np.float64)
+        return (self.base_score + leaf_values.sum(axis=1)).astype(np.float32)
+
+
+BACKENDS = {
+    "sklearn": SklearnBackend,
+    "inplace": InplaceBackend,
+    "numpy": TreeArrayBackend,
+}
+
+
+def load_model(model_path: str) -> xgb.XGBRegressor:
+    """Load an XGBRegressor, using the UBJSON export when available."""
+    artifact = resolve_model_artifact(model_path)
+    model = xgb.XGBRegressor()
+    model.load_model(artifact)
+    logger.info(f"Model loaded from {artifact}")
+    return model
+
+
+def make_backend(model: xgb.XGBRegressor, name: str = None):
+    name = name or INFERENCE_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name}")
+    return BACKENDS[name](model)
+
+
+if __name__ == "__main__":
+    from src.config import MODEL_PATH
+
+    logging.basicConfig(level=logging.INFO)
+    path = export_binary(load_model(MODEL_PATH), MODEL_PATH)
+    print(f"Exported {path}")
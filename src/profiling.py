@@ -0,0 +1,140 @@
+"""Lightweight stage timers and counters for the fetch/feature/predict/store pipeline.
+
+    with profiler.timer("fetch.consumption"):
+        ...
+
+    @timed("features.process_data")
+    def process_data(...): ...
+
+    profiler.count("fetch.records", len(items))
+
+Timings are aggregated per stage name (count, total, max) in one process-wide
+``Profiler``. ``report()`` gives a JSON-serializable summary for a run and
+``prometheus()`` renders the same numbers in the Prometheus text format. With
+``PROFILING_ENABLED=0`` timers and counters return immediately.
+"""
+import json
+import functools
+import threading
+import time
+
+from src.config import PROFILING_ENABLED
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}  # name -> [count, total, max]
+            self._counters = {}
+            self._started = time.time()
+
+    def timer(self, name: str):
+        """Context manager that records the wall time of its block under ``name``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                self._stages[name] = [1, seconds, seconds]
+            else:
+                stage[0] += 1
+                stage[1] += seconds
+                if seconds > stage[2]:
+                    stage[2] = seconds
+
+    def count(self, name: str, value: float = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def report(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {"count": n, "total_s": round(total, 6), "mean_s": round(total / n, 6), "max_s": round(peak, 6)}
+                for name, (n, total, peak) in sorted(self._stages.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+            started = self._started
+        return {"started": started, "elapsed_s": round(time.time() - started, 3), "stages": stages, "counters": counters}
+
+    def write_report(self, path: str) -> dict:
+        report = self.report()
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def prometheus(self, gauges: dict = None, prefix: str = "epias") -> str:
+        """Stage timings and counters (plus optional ``{name: value}`` gauges) in Prometheus text format."""
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Wall time spent per pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for name, stage in report["stages"].items():
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stage["total_s"]}')
+        for name, value in report["counters"].items():
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, value in (gauges or {}).items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = f"{prefix}_{_metric_name(name)}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+profiler = Profiler(enabled=PROFILING_ENABLED)
+
+
+def timed(name: str):
+    """Decorator form of ``profiler.timer(name)``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with _Timer(profiler, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,201 @@
+"""Local model registry: versioned model artifacts with their metadata.
+
+Layout under ``MODEL_REGISTRY_DIR``::
+
+    v0001/model.json  v0001/model.ubj  v0001/meta.json
+    v0002/...
+    PINNED            optional; the version to serve instead of the newest one
+
+A version is written to a hidden temporary directory and renamed into place,
+so readers (the API's reload watcher) never see a half-written version.
+Versions are never modified after publishing.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+
+from src.config import FEATURE_COLUMNS, MODEL_REGISTRY_DIR
+from src.model_backend import export_binary, model_fingerprint, resolve_model_artifact
+
+logger = logging.getLogger(__name__)
+
+VERSION_PATTERN = re.compile(r"^v(\d+)$")
+PIN_FILE = "PINNED"
+
+
+class ModelValidationError(ValueError):
+    """Raised when a model artifact does not match the current feature columns."""
+
+
+def feature_signature() -> dict:
+    """The feature layout a model is trained against, stored with each version."""
+    from src.features import FEATURE_VERSION
+    from src.sources import feature_config_signature
+
+    return {
+        "feature_columns": list(FEATURE_COLUMNS),
+        "feature_version": FEATURE_VERSION,
+        "feature_config": feature_config_signature(),
+    }
+
+
+def validate_model(model, meta: dict = None):
+    """Reject models whose inputs differ from FEATURE_COLUMNS; warn on a different feature config."""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    names = booster.feature_names
+    if names is not None and list(names) != FEATURE_COLUMNS:
+        raise ModelValidationError(f"Model features {list(names)} do not match FEATURE_COLUMNS.")
+    if booster.num_features() != len(FEATURE_COLUMNS):
+        raise ModelValidationError(
+            f"Model expects {booster.num_features()} features, FEATURE_COLUMNS has {len(FEATURE_COLUMNS)}."
+        )
+
+    if meta:
+        if meta.get("feature_columns") not in (None, FEATURE_COLUMNS):
+            raise ModelValidationError(f"Version {meta.get('version')} was trained on different feature columns.")
+        expected = feature_signature()
+        for key in ("feature_version", "feature_config"):
+            if meta.get(key) is not None and meta[key] != expected[key]:
+                logger.warning(f"Version {meta.get('version')} has {key}={meta[key]}, current is {expected[key]}.")
+
+
+class ModelRegistry:
+    def __init__(self, root: str = None):
+        self.root = root or MODEL_REGISTRY_DIR
+
+    def _dir(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+    def model_path(self, version: str) -> str:
+        return os.path.join(self._dir(version), "model.json")
+
+    def versions(self) -> list:
+        """Published versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        found = [v for v in os.listdir(self.root) if VERSION_PATTERN.match(v) and os.path.isdir(self._dir(v))]
+        return sorted(found, key=lambda v: int(VERSION_PATTERN.match(v).group(1)))
+
+    def meta(self, version: str) -> dict:
+        path = os.path.join(self._dir(version), "meta.json")
+        if not os.path.exists(path):
+            raise KeyError(f"Unknown model version: {version}")
+        with open(path) as f:
+            return json.load(f)
+
+    def entries(self) -> list:
+        return [self.meta(v) for v in self.versions()]
+
+    def latest(self):
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def pinned(self):
+        path = os.path.join(self.root, PIN_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read().strip() or None
+
+    def active_version(self):
+        """The pinned version if any, otherwise the newest one."""
+        return self.pinned() or self.latest()
+
+    def active_source(self, fallback_path: str):
+        """(model path, version) to serve: the active version, or ``fallback_path`` while the registry is empty."""
+        version = self.active_version()
+        return (self.model_path(version), version) if version else (fallback_path, None)
+
+    def previous_version(self, version: str):
+        versions = self.versions()
+        if version not in versions:
+            raise KeyError(f"Unknown model version: {version}")
+        index = versions.index(version)
+        return versions[index - 1] if index > 0 else None
+
+    def pin(self, version: str):
+        self.meta(version)  # raises for unknown versions
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".pin-")
+        with os.fdopen(fd, "w") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(self.root, PIN_FILE))
+        logger.info(f"Pinned model version {version}")
+
+    def unpin(self):
+        path = os.path.join(self.root, PIN_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+            logger.info("Unpinned model version; serving the newest one")
+
+    def publish(self, model, **info) -> str:
+        """Store ``model`` as the next version; ``info`` (params, metrics, ...) goes into its metadata."""
+        validate_model(model)
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.root, prefix=".staging-")
+        try:
+            model_path = os.path.join(staging, "model.json")
+            model.save_model(model_path)
+            export_binary(model, model_path)
+            booster = model.get_booster() if hasattr(model, "get_booster") else model
+            meta = {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "fingerprint": model_fingerprint(resolve_model_artifact(model_path)),
+                "n_trees": booster.num_boosted_rounds(),
+                **feature_signature(),
+                **info,
+            }
+
+            # Another publisher may take the same number; the rename fails and we try the next one
+            while True:
+                latest = self.latest()
+                number = int(VERSION_PATTERN.match(latest).group(1)) + 1 if latest else 1
+                version = f"v{number:04d}"
+                meta["version"] = version
+                with open(os.path.join(staging, "meta.json"), "w") as f:
+                    json.dump(meta, f, indent=2, default=str)
+                try:
+                    os.rename(staging, self._dir(version))
+                    break
+                except OSError:
+                    if not os.path.exists(self._dir(version)):
+                        raise
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        logger.info(f"Published model version {version} to {self.root}")
+        return version
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Inspect and manage the local model registry.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show versions and which one is active")
+    publish = sub.add_parser("publish", help="Add an existing model file as the next version")
+    publish.add_argument("model_path")
+    sub.add_parser("pin", help="Serve a specific version").add_argument("version")
+    sub.add_parser("unpin", help="Serve the newest version again")
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    if args.command == "list":
+        active, pinned = registry.active_version(), registry.pinned()
+        for meta in registry.entries():
+            marker = "*" if meta["version"] == active else " "
+            note = " (pinned)" if meta["version"] == pinned else ""
+            print(f"{marker} {meta['version']}  {meta['created']}  {meta['fingerprint']}  {meta['n_trees']} trees{note}")
+    elif args.command == "publish":
+        from src.model_backend import load_model
+
+        print(registry.publish(load_model(args.model_path), source=args.model_path))
+    elif args.command == "pin":
+        registry.pin(args.version)
+    else:
+        registry.unpin()
@@ -0,0 +1,132 @@
+import os
+import hashlib
+import logging
+
+import holidays
+import pandas as pd
+
+from src.config import FEATURE_COLUMNS, FEATURE_CACHE_DIR, WEATHER_LOCATIONS, WEATHER_MODEL
+from src.data_loader import DataLoader
+from src.features import FEATURE_VERSION, RAMADAN_DATES, KURBAN_DATES
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored layout changes (frames are stored with compact dtypes since format 2)
+FEATURE_CACHE_FORMAT = 2
+
+
+def feature_config_signature() -> str:
+    """Everything besides the raw inputs that changes the processed feature frame."""
+    parts = [str(FEATURE_VERSION), ",".join(FEATURE_COLUMNS), repr(RAMADAN_DATES), repr(KURBAN_DATES), holidays.__version__,
+             WEATHER_LOCATIONS, WEATHER_MODEL]
+    return "|".join(parts)
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()
+
+
+def load_snapshot(path: str) -> pd.DataFrame:
+    """Read a ``date,...`` CSV or Parquet snapshot with a tz-aware Istanbul ``date`` column.
+
+    CSVs are converted once to a sibling ``.parquet`` file with typed columns,
+    which later reads use as long as it is newer than the CSV.
+    """
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(path):
+        return pd.read_parquet(parquet_path)
+
+    df = pd.read_csv(path)
+    df['date'] = pd.to_datetime(df['date'], utc=True).dt.tz_convert("Europe/Istanbul")
+    for col in df.columns.drop('date'):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df.to_parquet(parquet_path, index=False)
+    logger.info(f"Converted {path} to {parquet_path}")
+    return df
+
+
+class LiveSource:
+    """Consumption from EPIAS and weather from Open-Meteo for a date range."""
+
+    def __init__(self, start_date, end_date, data_loader: DataLoader = None):
+        self.start_date = pd.Timestamp(start_date)
+        self.end_date = pd.Timestamp(end_date)
+        self.data_loader = data_loader or DataLoader()
+
+    def cache_key(self):
+        # Live data can be revised, so the key is derived from the fetched content instead
+        return None
+
+    def load(self):
+        consumption_df = self.data_loader.get_realtime_consumption(self.start_date, self.end_date)
+        if consumption_df.empty:
+            raise ValueError("No consumption data fetched.")
+
+        forecast_df = self.data_loader.get_weather_forecast(
+            start_date=consumption_df['date'].min(),
+            end_date=consumption_df['date'].max()
+        )
+        return consumption_df, forecast_df
+
+
+class SnapshotSource:
+    """Consumption (and optionally weather) from local snapshot files.
+
+    Without ``weather_path`` the weather for the snapshot's range comes from
+    ``DataLoader``, which serves it from the local history store when cached.
+    """
+
+    def __init__(self, consumption_path: str, weather_path: str = None, data_loader: DataLoader = None):
+        self.consumption_path = consumption_path
+        self.weather_path = weather_path
+        self.data_loader = data_loader
+
+    def cache_key(self):
+        # Fetched weather is only known after loading, so the key then comes from the loaded content
+        if not self.weather_path:
+            return None
+        parts = []
+        for path in (self.consumption_path, self.weather_path):
+            st = os.stat(path)
+            parts.append(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}")
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    def load(self):
+        consumption_df = load_snapshot(self.consumption_path)
+        if self.weather_path:
+            forecast_df = load_snapshot(self.weather_path)
+        else:
+            loader = self.data_loader or DataLoader()
+            forecast_df = loader.get_weather_forecast(consumption_df['date'].min(), consumption_df['date'].max())
+        return consumption_df, forecast_df
+
+
+class FeatureCache:
+    """Processed training frames on disk, keyed by input and feature-config hashes."""
+
+    def __init__(self, root: str = None):
+        self.root = root or FEATURE_CACHE_DIR
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.parquet")
+
+    def key(self, input_key: str) -> str:
+        return hashlib.sha1(f"{input_key}|{feature_config_signature()}|{FEATURE_CACHE_FORMAT}".encode()).hexdigest()[:16]
+
+    def get(self, key: str):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        logger.info(f"Loaded processed features from {path}")
+        return pd.read_parquet(path)
+
+    def put(self, key: str, df: pd.DataFrame):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+        logger.info(f"Cached processed features to {path}")
@@ -0,0 +1,154 @@
+import os
+import logging
+import threading
+import pandas as pd
+from datetime import date, timedelta
+
+from src.config import HISTORY_STORE_DIR, HISTORY_MUTABLE_DAYS
+
+logger = logging.getLogger(__name__)
+
+TIMEZONE = "Europe/Istanbul"
+HOURS_PER_DAY = 24
+
+
+def to_day(value) -> date:
+    """Normalize a date, datetime or Timestamp to its Istanbul calendar day."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert(TIMEZONE)
+    return ts.date()
+
+
+def contiguous_runs(days: list) -> list:
+    """Group sorted days into (first, last) runs of consecutive days."""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [(first, last) for first, last in runs]
+
+
+def combine_frames(frames: list) -> pd.DataFrame:
+    """Concatenate stored and fetched frames, keeping the freshest row per timestamp."""
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    return df.drop_duplicates(subset=['date'], keep='last').sort_values('date').reset_index(drop=True)
+
+
+class HistoryStore:
+    """Local Parquet store for hourly series, one file per source and day.
+
+    Layout is ``<root>/<source>/<YYYY-MM-DD>.parquet``. Only complete days that
+    are older than the mutable window are persisted, so recent hours which
+    EPIAS or Open-Meteo may still revise are always fetched again.
+    """
+
+    def __init__(self, root: str = None, mutable_days: int = None):
+        self.root = root or HISTORY_STORE_DIR
+        self.mutable_days = HISTORY_MUTABLE_DAYS if mutable_days is None else mutable_days
+
+    def _path(self, source: str, day: date) -> str:
+        return os.path.join(self.root, source, f"{day.isoformat()}.parquet")
+
+    def is_settled(self, day: date) -> bool:
+        return day < date.today() - timedelta(days=self.mutable_days)
+
+    def has(self, source: str, day: date) -> bool:
+        return os.path.exists(self._path(source, day))
+
+    def missing_days(self, source: str, start_date, end_date) -> list:
+        """Days in the range that are not stored yet or may still change."""
+        days = pd.date_range(to_day(start_date), to_day(end_date), freq='D').date
+        return [d for d in days if not (self.is_settled(d) and self.has(source, d))]
+
+    def plan(self, source: str, start_date, end_date):
+        """Split a range into days served from the store and (first, last) runs that must be fetched."""
+        missing = self.missing_days(source, start_date, end_date)
+        missing_set = set(missing)
+        days = pd.date_range(to_day(start_date), to_day(end_date), freq='D').date
+        stored_days = [d for d in days if d not in missing_set]
+        return stored_days, contiguous_runs(missing)
+
+    def merge(self, source: str, stored_days: list, fetched: list) -> pd.DataFrame:
+        """Persist the frames fetched for ``plan``'s missing runs and combine them with the stored days."""
+        for df in fetched:
+            self.write(source, df)
+        logger.info(f"{source}: {len(stored_days)} day(s) from store, {len(fetched)} range(s) fetched")
+        return combine_frames([self.read(source, stored_days), *fetched])
+
+    def read(self, source: str, days: list) -> pd.DataFrame:
+        frames = [pd.read_parquet(self._path(source, d)) for d in days if self.has(source, d)]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def write(self, source: str, df: pd.DataFrame) -> int:
+        """Persist every settled, complete day of ``df``. Returns the number of days written."""
+        if df.empty:
+            return 0
+
+        os.makedirs(os.path.join(self.root, source), exist_ok=True)
+        written = 0
+        for day, day_df in df.groupby(df['date'].dt.date):
+            if not self.is_settled(day):
+                continue
+            if len(day_df) < HOURS_PER_DAY or day_df.drop(columns='date').isna().any().any():
+                continue
+
+            path = self._path(source, day)
+            tmp_path = f"{path}.tmp"
+            day_df.reset_index(drop=True).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            written += 1
+
+        if written:
+            logger.info(f"Stored {written} day(s) of {source} in {self.root}")
+        return written
+
+
+class FetchMemo:
+    """Run-scoped, in-memory record of the days already fetched for each source.
+
+    Unlike ``HistoryStore`` it also keeps recent and partial days, so callers
+    in one run that ask for overlapping ranges reach the network once.
+    """
+
+    def __init__(self):
+        self._frames = {}
+        self._days = {}
+        self._lock = threading.Lock()
+
+    def plan(self, source: str, start_date, end_date):
+        """Split a range into days already in the memo and (first, last) runs still to fetch."""
+        days = pd.date_range(to_day(start_date), to_day(end_date), freq='D').date
+        with self._lock:
+            known = self._days.get(source, set())
+        covered = [d for d in days if d in known]
+        return covered, contiguous_runs([d for d in days if d not in known])
+
+    def read(self, source: str, days: list) -> pd.DataFrame:
+        with self._lock:
+            df = self._frames.get(source)
+        if df is None or df.empty or not days:
+            return pd.DataFrame()
+        return df[_local_days(df['date']).isin(set(days))]
+
+    def add(self, source: str, df: pd.DataFrame):
+        """Remember the days that came back with data; empty days are retried on the next call."""
+        if df.empty or 'date' not in df.columns:
+            return
+        with self._lock:
+            self._frames[source] = combine_frames([self._frames.get(source, pd.DataFrame()), df])
+            self._days.setdefault(source, set()).update(_local_days(df['date']).unique())
+
+
+def _local_days(dates: pd.Series) -> pd.Series:
+    dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert(TIMEZONE)
+    return dates.dt.date
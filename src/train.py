@@ -1,70 +1,322 @@
+import argparse
 import logging
+import resource
+import sys
+import time
+from datetime import date, timedelta
+import numpy as np
 import xgboost as xgb
 import pandas as pd
 
-from src.data_loader import DataLoader
-from src.features import FeatureEngineer
-from src.config import FEATURE_COLUMNS, TARGET_COLUMN, MODEL_PATH
+from src.features import FeatureEngineer, compact_frame
+from src.sources import LiveSource, SnapshotSource, FeatureCache, frame_digest
+from src.config import FEATURE_COLUMNS, TARGET_COLUMN, MODEL_PATH, TUNING_LOG_PATH, MODEL_REGISTRY_DIR
+from src.model_backend import export_binary, load_model
+from src.metrics import mae
+from src.registry import ModelRegistry
+from src import tuning
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PARAMS = {
+    "n_estimators": 600,
+    "learning_rate": 0.03,
+    "max_depth": 6,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "objective": 'reg:squarederror'
+}
+
+UPDATE_MODES = ("continue", "refresh")
+UPDATE_REFERENCES = ("refit", "current")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def as_regressor(booster: xgb.Booster) -> xgb.XGBRegressor:
+    """Wrap a Booster from xgb.train in an XGBRegressor, the type the standard fit returns."""
+    model = xgb.XGBRegressor()
+    model.load_model(bytearray(booster.save_raw("ubj")))
+    return model
+
+
+class FrameChunkIter(xgb.DataIter):
+    """Feeds a frame to QuantileDMatrix in row chunks so no full float copy is materialized."""
+
+    def __init__(self, X: pd.DataFrame, y: pd.Series, chunk_rows: int):
+        self.X, self.y, self.chunk_rows = X, y, chunk_rows
+        self._pos = 0
+        super().__init__()
+
+    def next(self, input_data) -> bool:
+        if self._pos >= len(self.X):
+            return False
+        end = self._pos + self.chunk_rows
+        input_data(data=self.X.iloc[self._pos:end], label=self.y.iloc[self._pos:end].to_numpy(dtype=np.float32))
+        self._pos = end
+        return True
+
+    def reset(self):
+        self._pos = 0
+
+
+def recent_split(df: pd.DataFrame, recent_days: int, holdout_days: int):
+    """(earlier, recent, holdout) row blocks of a sorted frame: the last ``holdout_days`` days,
+    the ``recent_days`` before them, and all rows before the holdout (which include ``recent``)."""
+    days = pd.Index(df.index.date)
+    unique_days = days.unique()
+    if len(unique_days) <= holdout_days + 1:
+        raise ValueError("Not enough history for the requested holdout.")
+
+    holdout_start = int(np.searchsorted(days, unique_days[-holdout_days]))
+    recent_start = int(np.searchsorted(days, unique_days[max(0, len(unique_days) - holdout_days - recent_days)]))
+    return df.iloc[:holdout_start], df.iloc[recent_start:holdout_start], df.iloc[holdout_start:]
+
 
 class Trainer:
-    def __init__(self):
-        self.data_loader = DataLoader()
+    def __init__(self, source=None, feature_cache: FeatureCache = None):
+        self.source = source or LiveSource("2022-01-01", "2026-01-01")
+        self.feature_cache = feature_cache
         self.feature_engineer = FeatureEngineer()
         self.model = None
 
     def load_and_process_data(self) -> pd.DataFrame:
-        consumption_df = self.data_loader.get_realtime_consumption(
-            start_date=pd.Timestamp("2022-01-01"),
-            end_date=pd.Timestamp("2026-01-01")
-        )
+        # Snapshot sources know their key up front, so a cache hit skips loading entirely
+        source_key = self.source.cache_key()
+        if self.feature_cache and source_key:
+            cache_key = self.feature_cache.key(source_key)
+            cached = self.feature_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        if consumption_df.empty:
-            raise ValueError("No consumption data fetched.")
+        consumption_df, forecast_df = self.source.load()
 
-        min_date = consumption_df['date'].min()
-        max_date = consumption_df['date'].max()
+        if self.feature_cache:
+            if not source_key:
+                source_key = f"{frame_digest(consumption_df)}:{frame_digest(forecast_df)}"
+            cache_key = self.feature_cache.key(source_key)
+            cached = self.feature_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        forecast_df = self.data_loader.get_weather_forecast(
-            start_date=min_date,
-            end_date=max_date
-        )
-
-        df_processed = self.feature_engineer.process_data(consumption_df, forecast_df)
+        # Features are built in compact dtypes, so no float64 copy of the history is ever held
+        df_processed = self.feature_engineer.process_data(consumption_df, forecast_df, compact=True)
+        del consumption_df
         df_model = df_processed.dropna()
+        del df_processed
+
+        # A failed or partial weather fetch must not be cached as if it were the real frame
+        if self.feature_cache and not forecast_df.empty and 'forecast_temp' in forecast_df.columns:
+            self.feature_cache.put(cache_key, df_model)
+        elif self.feature_cache:
+            logger.warning("Weather is missing; processed features were not cached.")
 
         return df_model
 
-    def train(self):
-        df = self.load_and_process_data()
+    def train(self, params: dict = None, df: pd.DataFrame = None, lean: bool = False, chunk_rows: int = None,
+              publish: bool = False):
+        """Fit on data before 2026 and write MODEL_PATH; ``publish`` also adds it to the registry as the next version."""
+        if df is None:
+            df = self.load_and_process_data()
 
-        train = df.loc[df.index < '2026-01-01']
+        # A positional slice is a view, not a second copy of the frame held during the fit
+        train = df.iloc[:df.index.searchsorted(pd.Timestamp('2026-01-01', tz=df.index.tz))]
+        params = params or DEFAULT_PARAMS
 
-        X_train = train[FEATURE_COLUMNS]
-        y_train = train[TARGET_COLUMN]
+        if lean:
+            model = self._fit_lean(train, params, chunk_rows)
+        else:
+            X_train = train[FEATURE_COLUMNS]
+            y_train = train[TARGET_COLUMN]
 
-        params = {
-            "n_estimators": 600,
-            "learning_rate": 0.03,
-            "max_depth": 6,
-            "subsample": 0.8,
-            "colsample_bytree": 0.8,
-            "objective": 'reg:squarederror'
-        }
+            model = xgb.XGBRegressor(n_jobs=-1, **params)
 
-        model = xgb.XGBRegressor(n_jobs=-1, **params)
+            logger.info("Training model...")
+            model.fit(X_train, y_train)
 
-        logger.info("Training model...")
-        model.fit(X_train, y_train)
+        self._save(model, publish, params=params, train_rows=len(train), train_end=str(train.index.max()), lean=lean)
+        logger.info(f"Training complete. Peak RSS {peak_rss_mb():.0f} MiB")
+        self.model = model
+        return model
 
+    def _save(self, model, publish: bool, **info):
+        """Write MODEL_PATH and its UBJSON copy; with ``publish``, also add the model to the registry."""
         model.save_model(MODEL_PATH)
         logger.info(f"Model exported to {MODEL_PATH}")
-        logger.info("Training complete.")
+        ubj_path = export_binary(model, MODEL_PATH)
+        logger.info(f"Binary model exported to {ubj_path}")
+        if publish and MODEL_REGISTRY_DIR:
+            return ModelRegistry().publish(model, **info)
+        return None
+
+    def _fit_lean(self, train: pd.DataFrame, params: dict, chunk_rows: int = None) -> xgb.XGBRegressor:
+        """Fit on compact dtypes through a QuantileDMatrix instead of XGBRegressor.fit."""
+        X_train = compact_frame(train, FEATURE_COLUMNS)
+        y_train = train[TARGET_COLUMN]
+        logger.info(f"Compact feature frame: {X_train.memory_usage(deep=True).sum() / 2**20:.1f} MiB")
 
+        if chunk_rows:
+            chunks = FrameChunkIter(X_train, y_train, chunk_rows)
+            dtrain = xgb.QuantileDMatrix(chunks, nthread=-1)
+            del chunks
+        else:
+            dtrain = xgb.QuantileDMatrix(X_train, y_train.to_numpy(dtype=np.float32), nthread=-1)
+        # The quantized matrix holds its own copy; drop ours (and the iterator's) before boosting
+        del X_train, y_train
+
+        booster_params = {k: v for k, v in params.items() if k != 'n_estimators'}
+        booster_params.update(tree_method='hist', nthread=-1)
+
+        logger.info("Training model (lean)...")
+        booster = xgb.train(booster_params, dtrain, num_boost_round=params.get('n_estimators', 100))
+        return as_regressor(booster)
+
+    def update(self, mode: str = "continue", recent_days: int = 56, holdout_days: int = 14, rounds: int = 100,
+               reference: str = "refit", tolerance: float = 0.0, max_trees: int = 1200, params: dict = None,
+               df: pd.DataFrame = None) -> dict:
+        """Warm-start the served model on recent data and keep it only if its holdout MAE is not worse.
+
+        ``continue`` appends ``rounds`` trees fitted on the last ``recent_days`` days;
+        ``refresh`` re-fits the leaf values of the existing trees on that window
+        (``process_type=update``) and keeps the tree count. A ``continue`` that would
+        take the model past ``max_trees`` trees runs as ``refresh`` instead. The last
+        ``holdout_days`` days are held out from every fit. The candidate is compared
+        with the current model and, with ``reference="refit"``, with a full refit on
+        all earlier data. It is saved and published only when its MAE is within
+        ``tolerance`` of the best of them.
+        """
+        if mode not in UPDATE_MODES:
+            raise ValueError(f"Unknown update mode: {mode}")
+        if reference not in UPDATE_REFERENCES:
+            raise ValueError(f"Unknown update reference: {reference}")
+        if df is None:
+            df = self.load_and_process_data()
+        params = params or DEFAULT_PARAMS
+
+        earlier, recent, holdout = recent_split(df.sort_index(), recent_days, holdout_days)
+        base_path, base_version = ModelRegistry().active_source(MODEL_PATH) if MODEL_REGISTRY_DIR else (MODEL_PATH, None)
+        base = load_model(base_path).get_booster()
+
+        X_holdout = holdout[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+        y_holdout = holdout[TARGET_COLUMN].to_numpy()
+        report = {
+            "mode": mode, "base_version": base_version, "base_trees": base.num_boosted_rounds(),
+            "recent_rows": len(recent), "holdout_rows": len(holdout),
+            "holdout_start": str(holdout.index.min()), "mae_current": mae(y_holdout, base.inplace_predict(X_holdout)),
+        }
+
+        if mode == "continue" and base.num_boosted_rounds() + rounds > max_trees:
+            logger.warning(f"Appending {rounds} trees would exceed {max_trees}; refreshing the existing trees instead.")
+            mode = report["mode"] = "refresh"
+
+        booster_params = {k: v for k, v in params.items() if k != 'n_estimators'}
+        booster_params.update(nthread=-1)
+        if mode == "refresh":
+            # The refresh updater walks the existing trees; a tree_method would only conflict with it
+            booster_params.update(process_type='update', updater='refresh', refresh_leaf=True)
+            booster_params.pop('tree_method', None)
+            rounds = base.num_boosted_rounds()
+        else:
+            booster_params.update(tree_method='hist')
+        dtrain = xgb.DMatrix(compact_frame(recent, FEATURE_COLUMNS), recent[TARGET_COLUMN].to_numpy(dtype=np.float32))
+
+        logger.info(f"Updating {base_version or base_path} ({mode}) on {len(recent)} recent rows...")
+        start = time.perf_counter()
+        candidate = xgb.train(booster_params, dtrain, num_boost_round=rounds, xgb_model=base)
+        report["update_seconds"] = round(time.perf_counter() - start, 2)
+        report["candidate_trees"] = candidate.num_boosted_rounds()
+        report["mae_candidate"] = mae(y_holdout, candidate.inplace_predict(X_holdout))
+
+        if reference == "refit":
+            logger.info(f"Refitting from scratch on {len(earlier)} rows for comparison...")
+            start = time.perf_counter()
+            refit = self._fit_lean(earlier, params)
+            report["refit_seconds"] = round(time.perf_counter() - start, 2)
+            report["mae_refit"] = mae(y_holdout, refit.get_booster().inplace_predict(X_holdout))
+
+        best = min(report["mae_current"], report.get("mae_refit", float("inf")))
+        report["accepted"] = report["mae_candidate"] <= best * (1 + tolerance)
+        logger.info(f"Holdout MAE: candidate {report['mae_candidate']:.2f}, current {report['mae_current']:.2f}"
+                    + (f", refit {report['mae_refit']:.2f}" if "mae_refit" in report else ""))
+
+        if report["accepted"]:
+            report["version"] = self._save(candidate, True, update=report, params=params, train_end=str(recent.index.max()))
+            self.model = as_regressor(candidate)
+        else:
+            logger.warning(f"Candidate is worse than the best reference by more than {tolerance:.0%}; not saved.")
+        return report
+
+    def tune(self, n_trials: int = 20, n_folds: int = 4, valid_days: int = 56, workers: int = 1,
+             seed: int = 0, log_path: str = TUNING_LOG_PATH, publish: bool = False):
+        """Search parameters with expanding-window CV, then refit the best set on all data."""
+        df = self.load_and_process_data()
+        train = df.loc[df.index < '2026-01-01'].sort_index()
+
+        folds = tuning.time_series_folds(train.index, n_folds, valid_days)
+        trials = tuning.sample_params(n_trials, seed=seed)
+        logger.info(f"Tuning {len(trials)} trial(s) over {len(folds)} fold(s) with {workers} worker(s)...")
+
+        log = tuning.search(
+            train[FEATURE_COLUMNS].to_numpy(), train[TARGET_COLUMN].to_numpy(), folds, trials, workers=workers
+        )
+        log.to_csv(log_path, index=False)
+        logger.info(f"Trial log written to {log_path}")
+
+        best = log.iloc[0]
+        params = {k: best[k] for k in tuning.SEARCH_SPACE}
+        params = {k: (v.item() if hasattr(v, 'item') else v) for k, v in params.items()}
+        params.update(n_estimators=int(best['best_rounds']), objective='reg:squarederror')
+        logger.info(f"Best CV MAE {best['mae']:.2f} with {params}")
+
+        return self.train(params=params, df=df, publish=publish)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    trainer = Trainer()
-    trainer.train()
+
+    parser = argparse.ArgumentParser(description="Train the consumption model.")
+    parser.add_argument('--consumption-csv', default=None, help="Train from a local date,consumption snapshot (CSV or Parquet)")
+    parser.add_argument('--weather-csv', default=None, help="Local date,forecast_temp snapshot; fetched when omitted")
+    parser.add_argument('--no-feature-cache', action='store_true', help="Always rebuild the feature frame")
+    parser.add_argument('--tune', action='store_true', help="Run CV hyperparameter search before the final fit")
+    parser.add_argument('--trials', type=int, default=20)
+    parser.add_argument('--folds', type=int, default=4)
+    parser.add_argument('--valid-days', type=int, default=56, help="Days per validation fold")
+    parser.add_argument('--workers', type=int, default=1, help="Processes for the search")
+    parser.add_argument('--lean', action='store_true', help="Fit on compact dtypes through a QuantileDMatrix")
+    parser.add_argument('--chunk-rows', type=int, default=None, help="With --lean, stream the matrix in chunks of this many rows")
+    parser.add_argument('--publish', action='store_true',
+                        help="Also add the trained model to MODEL_REGISTRY_DIR, where the API picks it up")
+    parser.add_argument('--update', choices=UPDATE_MODES, default=None,
+                        help="Warm-start the served model on recent data instead of training from scratch")
+    parser.add_argument('--recent-days', type=int, default=56, help="With --update, days of data to update on")
+    parser.add_argument('--holdout-days', type=int, default=14, help="With --update, latest days held out for the comparison")
+    parser.add_argument('--rounds', type=int, default=100, help="With --update continue, boosting rounds to append")
+    parser.add_argument('--reference', choices=UPDATE_REFERENCES, default="refit",
+                        help="With --update, also compare against a full refit, or only against the current model")
+    parser.add_argument('--tolerance', type=float, default=0.0, help="With --update, relative MAE slack allowed")
+    parser.add_argument('--max-trees', type=int, default=1200,
+                        help="With --update continue, refresh instead once the model would exceed this many trees")
+    args = parser.parse_args()
+
+    if args.consumption_csv:
+        source = SnapshotSource(args.consumption_csv, args.weather_csv)
+    elif args.update:
+        # Live updates run on data up to yesterday; comparing with the current model only needs the recent window
+        end = pd.Timestamp(date.today())
+        start = "2022-01-01" if args.reference == "refit" else end - timedelta(days=args.recent_days + args.holdout_days + 14)
+        source = LiveSource(start, end)
+    else:
+        source = None
+    trainer = Trainer(source=source, feature_cache=None if args.no_feature_cache else FeatureCache())
+    if args.update:
+        trainer.update(mode=args.update, recent_days=args.recent_days, holdout_days=args.holdout_days, rounds=args.rounds,
+                       reference=args.reference, tolerance=args.tolerance, max_trees=args.max_trees)
+    elif args.tune:
+        trainer.tune(n_trials=args.trials, n_folds=args.folds, valid_days=args.valid_days, workers=args.workers, publish=args.publish)
+    else:
+        trainer.train(lean=args.lean, chunk_rows=args.chunk_rows, publish=args.publish)
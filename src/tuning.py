@@ -0,0 +1,133 @@
+"""Time-series cross-validation and parallel hyperparameter search for the XGBoost model.
+
+Folds are expanding windows: each validation block is a run of consecutive
+days and the model is trained on everything before it. Trials run across
+worker processes; each worker builds the QuantileDMatrix pair for a fold
+once and reuses it for every trial it evaluates, and early stopping caps the
+number of boosting rounds per trial.
+"""
+import os
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SPACE = {
+    "learning_rate": [0.02, 0.03, 0.05, 0.08],
+    "max_depth": [4, 5, 6, 7, 8],
+    "min_child_weight": [1, 3, 5, 10],
+    "subsample": [0.6, 0.7, 0.8, 0.9, 1.0],
+    "colsample_bytree": [0.6, 0.7, 0.8, 0.9, 1.0],
+    "reg_lambda": [0.5, 1.0, 2.0, 5.0],
+}
+MAX_ROUNDS = 3000
+EARLY_STOPPING_ROUNDS = 50
+
+_worker = {}
+
+
+def time_series_folds(index: pd.DatetimeIndex, n_folds: int, valid_days: int) -> list:
+    """(train_end, valid_end) row positions for expanding-window folds over a sorted index."""
+    days = pd.Index(index.date)
+    unique_days = days.unique()
+    if len(unique_days) <= n_folds * valid_days:
+        raise ValueError("Not enough history for the requested folds.")
+
+    folds = []
+    for k in range(n_folds, 0, -1):
+        valid_start = unique_days[len(unique_days) - k * valid_days]
+        valid_stop = unique_days[len(unique_days) - (k - 1) * valid_days] if k > 1 else None
+        train_end = int(np.searchsorted(days, valid_start))
+        valid_end = int(np.searchsorted(days, valid_stop)) if valid_stop is not None else len(days)
+        folds.append((train_end, valid_end))
+    return folds
+
+
+def sample_params(n_trials: int, seed: int = 0, space: dict = None) -> list:
+    """Random draws from the search space, deduplicated."""
+    space = space or SEARCH_SPACE
+    rng = np.random.default_rng(seed)
+    trials, seen = [], set()
+    for _ in range(n_trials * 20):
+        params = {k: v[rng.integers(len(v))] for k, v in space.items()}
+        params = {k: (v.item() if hasattr(v, 'item') else v) for k, v in params.items()}
+        key = json.dumps(params, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            trials.append(params)
+        if len(trials) == n_trials:
+            break
+    return trials
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray, folds: list, nthread: int):
+    _worker.update(X=X, y=y, folds=folds, nthread=nthread, matrices={})
+
+
+def _fold_matrices(i: int):
+    """Build (once per worker) the train/valid QuantileDMatrix pair for fold i."""
+    if i not in _worker['matrices']:
+        train_end, valid_end = _worker['folds'][i]
+        X, y = _worker['X'], _worker['y']
+        dtrain = xgb.QuantileDMatrix(X[:train_end], y[:train_end], nthread=_worker['nthread'])
+        dvalid = xgb.QuantileDMatrix(X[train_end:valid_end], y[train_end:valid_end], ref=dtrain, nthread=_worker['nthread'])
+        _worker['matrices'][i] = (dtrain, dvalid)
+    return _worker['matrices'][i]
+
+
+def _evaluate(trial: tuple) -> dict:
+    trial_id, params = trial
+    booster_params = {
+        "objective": "reg:squarederror",
+        "eval_metric": "mae",
+        "tree_method": "hist",
+        "nthread": _worker['nthread'],
+        **params,
+    }
+
+    scores, rounds = [], []
+    for i in range(len(_worker['folds'])):
+        dtrain, dvalid = _fold_matrices(i)
+        booster = xgb.train(
+            booster_params, dtrain, num_boost_round=MAX_ROUNDS,
+            evals=[(dvalid, "valid")], early_stopping_rounds=EARLY_STOPPING_ROUNDS, verbose_eval=False,
+        )
+        scores.append(booster.best_score)
+        rounds.append(booster.best_iteration + 1)
+
+    return {
+        "trial": trial_id,
+        **params,
+        "mae": float(np.mean(scores)),
+        "mae_std": float(np.std(scores)),
+        "best_rounds": int(np.round(np.mean(rounds))),
+        "fold_mae": [float(s) for s in scores],
+    }
+
+
+def search(X: np.ndarray, y: np.ndarray, folds: list, trials: list, workers: int = 1) -> pd.DataFrame:
+    """Evaluate every parameter set on every fold; returns the trial log sorted by mean MAE."""
+    workers = max(1, min(workers, len(trials)))
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.ascontiguousarray(y, dtype=np.float32)
+
+    results = []
+    jobs = list(enumerate(trials))
+    if workers == 1:
+        _init_worker(X, y, folds, nthread)
+        for job in jobs:
+            results.append(_evaluate(job))
+            logger.info(f"Trial {job[0]}: MAE {results[-1]['mae']:.2f}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y, folds, nthread)) as executor:
+            for result in executor.map(_evaluate, jobs):
+                results.append(result)
+                logger.info(f"Trial {result['trial']}: MAE {result['mae']:.2f}")
+
+    return pd.DataFrame(results).sort_values("mae").reset_index(drop=True)
@@ -0,0 +1,73 @@
+"""Open-Meteo locations and helpers for building a national temperature series.
+
+A location set is a list of ``(name, latitude, longitude, weight)`` tuples.
+Each location is fetched and cached on its own; the hourly temperatures are
+then combined into one weighted ``forecast_temp`` series.
+"""
+import pandas as pd
+
+from src.config import WEATHER_MODEL, WEATHER_CHUNK_DAYS
+
+# Weights are provincial populations in millions (TUIK, 2023)
+LOCATION_SETS = {
+    "central": [
+        ("central", 39.0, 35.0, 1.0),
+    ],
+    "cities": [
+        ("istanbul", 41.01, 28.98, 15.66),
+        ("ankara", 39.93, 32.86, 5.80),
+        ("izmir", 38.42, 27.14, 4.48),
+        ("bursa", 40.19, 29.06, 3.21),
+        ("antalya", 36.90, 30.70, 2.70),
+        ("konya", 37.87, 32.48, 2.32),
+        ("adana", 37.00, 35.32, 2.27),
+        ("sanliurfa", 37.16, 38.79, 2.17),
+        ("gaziantep", 37.07, 37.38, 2.16),
+        ("kocaeli", 40.77, 29.92, 2.08),
+    ],
+}
+
+
+def weather_locations(name: str) -> list:
+    if name not in LOCATION_SETS:
+        raise ValueError(f"Unknown weather location set: {name}")
+    return LOCATION_SETS[name]
+
+
+def location_source(location: tuple, model: str = None) -> str:
+    """History store source for one location, so cached days are keyed by (location, model, day)."""
+    _, lat, lon, _ = location
+    return f"weather/{lat:.2f}_{lon:.2f}_{model or WEATHER_MODEL}"
+
+
+def weather_chunks(start_date, end_date, days: int = None) -> list:
+    """Split a range into (start, end) windows of at most ``days`` days."""
+    days = days or WEATHER_CHUNK_DAYS
+    start, end = pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize()
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + pd.Timedelta(days=days - 1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + pd.Timedelta(days=1)
+    return chunks
+
+
+def combine_locations(frames: list, locations: list) -> pd.DataFrame:
+    """Weighted mean of per-location ``forecast_temp`` frames, renormalized where a location is missing."""
+    if len(frames) == 1:
+        return frames[0]
+
+    temps = {}
+    for (name, _, _, _), df in zip(locations, frames):
+        if not df.empty:
+            temps[name] = df.drop_duplicates(subset=['date']).set_index('date')['forecast_temp']
+    if not temps:
+        return pd.DataFrame()
+
+    wide = pd.DataFrame(temps).sort_index()
+    weights = pd.Series({name: weight for name, _, _, weight in locations})[wide.columns]
+    present = wide.notna()
+    total = present.mul(weights, axis=1).sum(axis=1)
+    combined = wide.fillna(0).mul(weights, axis=1).sum(axis=1) / total.where(total > 0)
+
+    return pd.DataFrame({'date': wide.index, 'forecast_temp': combined.to_numpy()})